@@ -7,12 +7,35 @@ import os
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production-min-32-chars")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440  # 24 hours
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))  # Tune password hashing cost to the target hardware
+SEED_BCRYPT_ROUNDS = int(os.getenv("SEED_BCRYPT_ROUNDS", "4"))  # Demo seed accounts use published passwords anyway
+
+# Remember successful bcrypt checks for a short time so repeated logins skip the KDF.
+# Trades a short window where a changed password hash is still honoured for lower login latency.
+PASSWORD_VERIFY_CACHE_ENABLED = os.getenv("PASSWORD_VERIFY_CACHE_ENABLED", "false").lower() == "true"
 
 # Database Configuration
 DATABASE_URL = "sqlite:///./leave_management.db"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))  # seconds before a pooled connection is replaced
+# Startup schema creation and demo seeding; set to 0 in production so workers
+# start without DDL checks or seed queries
+RUN_MIGRATIONS = os.getenv("RUN_MIGRATIONS", "1") == "1"
+SEED_DB = os.getenv("SEED_DB", "1") == "1"
+# Development/test aid: make unplanned lazy loads on hot-path queries raise
+# instead of silently issuing extra SELECTs
+STRICT_LOADING = os.getenv("STRICT_LOADING", "0") == "1"
 
 # CORS Configuration
-CORS_ORIGINS = ["*"]  # In production, replace with specific origins
+# Explicit origins are matched by set lookup; comma-separated in the environment
+CORS_ORIGINS = tuple(
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000").split(",")
+    if origin.strip()
+)
+# Optional pattern for wildcard hosts, e.g. r"^https://.*\.company\.com$" (compiled once by the middleware)
+CORS_ORIGIN_REGEX = os.getenv("CORS_ORIGIN_REGEX") or None
 
 # Server Configuration
 HOST = "0.0.0.0"
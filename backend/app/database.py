@@ -1,12 +1,37 @@
 """
 Database configuration and session management
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, declarative_base
-from .config import DATABASE_URL
+from sqlalchemy.pool import QueuePool
+from .config import DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE
+from .schemas.enums import UserRole, RequestStatus, ApprovalStatus
 
 # Create database engine
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=QueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=30,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    pool_use_lifo=True,
+)
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune each new SQLite connection for concurrent readers"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.close()
+
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -14,10 +39,76 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create base class for models
 Base = declarative_base()
 
-# Dependency to get database session
+
+def run_after_commit(session, key, callback):
+    """
+    Run callback once after the session's current transaction commits (dropped on
+    rollback). For cache invalidation from flush-time mapper events, which would
+    otherwise let readers re-cache pre-commit rows. Callbacks sharing a key run once.
+    """
+    session.info.setdefault("after_commit_callbacks", {})[key] = callback
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _run_after_commit_callbacks(session):
+    for callback in session.info.pop("after_commit_callbacks", {}).values():
+        callback()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _drop_after_commit_callbacks(session):
+    session.info.pop("after_commit_callbacks", None)
+
+# Dependency to get database session. FastAPI caches it per request, so the
+# endpoint and its dependencies share one session (and identity map) without a
+# thread-local scoped_session, which would break when they run on different
+# worker threads.
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# Enum columns shared by app.models and legacy_main. Both store member values
+# ("hr_admin"); SQLEnum's default in older legacy databases stored names ("HR_ADMIN").
+ENUM_COLUMNS = (
+    ("users", "role", UserRole),
+    ("leave_requests", "status", RequestStatus),
+    ("approval_workflow", "status", ApprovalStatus),
+)
+
+
+def convert_enum_names_to_values():
+    """
+    Rewrite enum columns still holding member names to the member values.
+    Idempotent, a no-op once converted; run after create_all on startup.
+    """
+    with engine.begin() as connection:
+        for table, column, enum_cls in ENUM_COLUMNS:
+            for member in enum_cls:
+                connection.execute(
+                    text(f"UPDATE {table} SET {column} = :value WHERE {column} = :name"),
+                    {"value": member.value, "name": member.name}
+                )
+
+
+# Indexes renamed since earlier releases
+OBSOLETE_INDEXES = ("ix_lr_user_status_dates",)
+
+
+def run_migrations(metadata):
+    """
+    Create missing tables and indexes for metadata, then convert legacy enum rows.
+    Runs on startup under RUN_MIGRATIONS, or once per deploy via python -m app.migrate.
+    """
+    metadata.create_all(bind=engine)
+    # create_all only indexes the tables it creates; add ones an existing file lacks
+    with engine.begin() as connection:
+        for name in OBSOLETE_INDEXES:
+            connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        for table in metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=connection, checkfirst=True)
+    convert_enum_names_to_values()
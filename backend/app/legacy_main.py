@@ -4,19 +4,35 @@ A comprehensive HR portal for managing employee leave requests with multi-level
 """
 
 from datetime import datetime, timedelta, date
-from typing import Optional, List, Annotated
+from typing import Optional, List, Annotated, Iterator
 from enum import Enum
+from functools import lru_cache
+import hashlib
+import itertools
 import os
+import threading
+import time
 
-from fastapi import FastAPI, Depends, HTTPException, status, APIRouter
+import anyio
+from fastapi import FastAPI, Depends, HTTPException, status, APIRouter, Query, Header, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, Column, Integer, String, Float, Date, DateTime, Boolean, ForeignKey, Enum as SQLEnum
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, ForeignKey, Enum as SQLEnum, CheckConstraint, Index, and_, bindparam, exists, func, insert, lambda_stmt, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session, relationship
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
-from jose import JWTError, jwt
+from sqlalchemy.orm import Session, relationship, joinedload, selectinload, load_only, contains_eager, column_property, make_transient_to_detached
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, AliasPath, TypeAdapter
+from pydantic_core import to_json
+from email_validator import validate_email, EmailNotValidError
+import jwt
 import bcrypt as bcrypt_lib
+import numpy as np
+from cachetools import LRUCache, TTLCache
+
+# Sessions on the pooled, WAL-tuned engine shared with the modular package
+from .config import BCRYPT_ROUNDS, SEED_BCRYPT_ROUNDS, CORS_ORIGINS, CORS_ORIGIN_REGEX, DB_POOL_SIZE, DB_MAX_OVERFLOW, RUN_MIGRATIONS, SEED_DB
+from .database import SessionLocal, run_migrations
 
 # ============================================================================
 # CONFIGURATION
@@ -24,16 +40,14 @@ import bcrypt as bcrypt_lib
 
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production-min-32-chars")
 ALGORITHM = "HS256"
+# Encoded once for jwt
+_SIGNING_KEY = SECRET_KEY.encode()
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440  # 24 hours
 
-DATABASE_URL = "sqlite:///./leave_management.db"
-
 # ============================================================================
 # DATABASE SETUP
 # ============================================================================
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 # ============================================================================
@@ -60,6 +74,27 @@ class ApprovalStatus(str, Enum):
 # DATABASE MODELS
 # ============================================================================
 
+def value_enum(enum_cls):
+    """
+    Enum column stored by member value, the representation app.models writes to
+    the same database (plain VARCHAR(16); the CHECK constraints below validate it)
+    """
+    return SQLEnum(
+        enum_cls,
+        values_callable=lambda members: [member.value for member in members],
+        native_enum=False,
+        create_constraint=False,
+        length=16,
+        validate_strings=True
+    )
+
+def enum_check(column: str, enum_cls, name: str) -> CheckConstraint:
+    """CHECK constraint matching the one app.models declares for the column"""
+    return CheckConstraint(
+        "{} IN ({})".format(column, ", ".join(f"'{member.value}'" for member in enum_cls)),
+        name=name
+    )
+
 class User(Base):
     __tablename__ = "users"
 
@@ -67,15 +102,24 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     full_name = Column(String, nullable=False)
     password_hash = Column(String, nullable=False)
-    role = Column(SQLEnum(UserRole), default=UserRole.EMPLOYEE, nullable=False)
+    role = Column(value_enum(UserRole), default=UserRole.EMPLOYEE, nullable=False)
     manager_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     department = Column(String, nullable=True)
     hire_date = Column(Date, default=date.today)
     is_active = Column(Boolean, default=True)
 
-    manager = relationship("User", remote_side=[id], backref="team_members")
-    leave_balances = relationship("LeaveBalance", back_populates="user")
-    leave_requests = relationship("LeaveRequest", back_populates="user")
+    # lazy="raise": load collections explicitly
+    manager = relationship("User", remote_side=[id], back_populates="team_members")
+    team_members = relationship("User", back_populates="manager", lazy="raise")
+    leave_balances = relationship("LeaveBalance", back_populates="user", lazy="raise")
+    leave_requests = relationship("LeaveRequest", back_populates="user", lazy="raise")
+
+    # Partial indexes over active users only, for the team and active-user filters
+    __table_args__ = (
+        enum_check("role", UserRole, "ck_users_role"),
+        Index("ix_users_active_manager", "manager_id", sqlite_where=is_active == True),
+        Index("ix_users_active", "id", sqlite_where=is_active == True),
+    )
 
 class LeaveType(Base):
     __tablename__ = "leave_types"
@@ -90,6 +134,10 @@ class LeaveType(Base):
     leave_balances = relationship("LeaveBalance", back_populates="leave_type")
     leave_requests = relationship("LeaveRequest", back_populates="leave_type")
 
+    __table_args__ = (
+        Index("ix_leave_types_active", "id", sqlite_where=is_active == True),
+    )
+
 class LeaveBalance(Base):
     __tablename__ = "leave_balances"
 
@@ -100,14 +148,12 @@ class LeaveBalance(Base):
     total_days = Column(Float, nullable=False)
     used_days = Column(Float, default=0)
     pending_days = Column(Float, default=0)
+    # SQL expression, loaded with the row
+    available_days = column_property(total_days - used_days - pending_days)
 
     user = relationship("User", back_populates="leave_balances")
     leave_type = relationship("LeaveType", back_populates="leave_balances")
 
-    @property
-    def available_days(self) -> float:
-        return self.total_days - self.used_days - self.pending_days
-
 class LeaveRequest(Base):
     __tablename__ = "leave_requests"
 
@@ -118,13 +164,26 @@ class LeaveRequest(Base):
     end_date = Column(Date, nullable=False)
     total_days = Column(Float, nullable=False)
     reason = Column(String, nullable=True)
-    status = Column(SQLEnum(RequestStatus), default=RequestStatus.PENDING)
+    status = Column(value_enum(RequestStatus), default=RequestStatus.PENDING)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     user = relationship("User", back_populates="leave_requests")
     leave_type = relationship("LeaveType", back_populates="leave_requests")
-    approval_workflow = relationship("ApprovalWorkflow", back_populates="leave_request")
+    approval_workflow = relationship(
+        "ApprovalWorkflow", back_populates="leave_request", order_by="ApprovalWorkflow.approval_level"
+    )
+
+    # Serve the newest-first keyset pages (SQLite scans these backwards for DESC),
+    # the per-user overlap probe, and the pending / calendar / history reports
+    __table_args__ = (
+        enum_check("status", RequestStatus, "ck_leave_requests_status"),
+        Index("ix_leave_requests_created_at_id", "created_at", "id"),
+        Index("ix_leave_requests_user_created", "user_id", "created_at"),
+        Index("ix_leave_requests_user_status_dates", "user_id", "status", "start_date", "end_date"),
+        Index("ix_leave_requests_status_created", "status", "created_at"),
+        Index("ix_leave_requests_user_dates", "user_id", "start_date", "end_date"),
+    )
 
 class ApprovalWorkflow(Base):
     __tablename__ = "approval_workflow"
@@ -133,13 +192,19 @@ class ApprovalWorkflow(Base):
     leave_request_id = Column(Integer, ForeignKey("leave_requests.id"), nullable=False)
     approver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     approval_level = Column(Integer, nullable=False)
-    status = Column(SQLEnum(ApprovalStatus), default=ApprovalStatus.PENDING)
+    status = Column(value_enum(ApprovalStatus), default=ApprovalStatus.PENDING)
     comments = Column(String, nullable=True)
     approved_at = Column(DateTime, nullable=True)
 
     leave_request = relationship("LeaveRequest", back_populates="approval_workflow")
     approver = relationship("User")
 
+    __table_args__ = (
+        enum_check("status", ApprovalStatus, "ck_approval_workflow_status"),
+        Index("ix_aw_req_level_status", "leave_request_id", "approval_level", "status"),
+        Index("ix_aw_req_approver_status", "leave_request_id", "approver_id", "status"),
+    )
+
 class Holiday(Base):
     __tablename__ = "holidays"
 
@@ -151,6 +216,10 @@ class Holiday(Base):
 
     creator = relationship("User")
 
+    __table_args__ = (
+        Index("ix_hol_date", "date"),
+    )
+
 class Delegation(Base):
     __tablename__ = "delegations"
 
@@ -164,6 +233,10 @@ class Delegation(Base):
     delegator = relationship("User", foreign_keys=[delegator_id])
     delegate = relationship("User", foreign_keys=[delegate_id])
 
+    __table_args__ = (
+        Index("ix_delegation_active", "delegator_id", "is_active", "start_date", "end_date"),
+    )
+
 # ============================================================================
 # PYDANTIC SCHEMAS
 # ============================================================================
@@ -200,6 +273,7 @@ class TokenData(BaseModel):
     user_id: Optional[int] = None
     email: Optional[str] = None
     role: Optional[str] = None
+    exp: Optional[int] = None
 
 # Leave Type Schemas
 class LeaveTypeBase(BaseModel):
@@ -228,7 +302,7 @@ class LeaveBalanceResponse(BaseModel):
     id: int
     user_id: int
     leave_type_id: int
-    leave_type_name: str
+    leave_type_name: str = Field(validation_alias=AliasPath("leave_type", "name"))
     year: int
     total_days: float
     used_days: float
@@ -252,9 +326,9 @@ class LeaveRequestUpdate(BaseModel):
 class LeaveRequestResponse(BaseModel):
     id: int
     user_id: int
-    user_name: str
+    user_name: str = Field(validation_alias=AliasPath("user", "full_name"))
     leave_type_id: int
-    leave_type_name: str
+    leave_type_name: str = Field(validation_alias=AliasPath("leave_type", "name"))
     start_date: date
     end_date: date
     total_days: float
@@ -273,7 +347,7 @@ class ApprovalWorkflowResponse(BaseModel):
     id: int
     leave_request_id: int
     approver_id: int
-    approver_name: str
+    approver_name: str = Field(validation_alias=AliasPath("approver", "full_name"))
     approval_level: int
     status: ApprovalStatus
     comments: Optional[str]
@@ -310,9 +384,9 @@ class DelegationCreate(BaseModel):
 class DelegationResponse(BaseModel):
     id: int
     delegator_id: int
-    delegator_name: str
+    delegator_name: str = Field(validation_alias=AliasPath("delegator", "full_name"))
     delegate_id: int
-    delegate_name: str
+    delegate_name: str = Field(validation_alias=AliasPath("delegate", "full_name"))
     start_date: date
     end_date: date
     is_active: bool
@@ -325,14 +399,29 @@ class DelegationResponse(BaseModel):
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt_lib.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+# bcrypt's input limit; bcrypt 5 raises past it
+_BCRYPT_MAX_PASSWORD_BYTES = 72
 
-def get_password_hash(password: str) -> str:
-    salt = bcrypt_lib.gensalt()
-    hashed = bcrypt_lib.hashpw(password.encode('utf-8'), salt)
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    password_bytes = plain_password.encode('utf-8')[:_BCRYPT_MAX_PASSWORD_BYTES]
+    # Empty never matches
+    if not password_bytes:
+        return False
+    return bcrypt_lib.checkpw(password_bytes, hashed_password.encode('utf-8'))
+
+def get_password_hash(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    salt = bcrypt_lib.gensalt(rounds=rounds)
+    hashed = bcrypt_lib.hashpw(password.encode('utf-8')[:_BCRYPT_MAX_PASSWORD_BYTES], salt)
     return hashed.decode('utf-8')
 
+@lru_cache(maxsize=4096)
+def normalize_email(email: str) -> Optional[str]:
+    """Normalize an email the way EmailStr stores it; None if it is not a valid address"""
+    try:
+        return validate_email(email, check_deliverability=False).normalized
+    except EmailNotValidError:
+        return None
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -340,19 +429,19 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _SIGNING_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 def decode_access_token(token: str) -> TokenData:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, _SIGNING_KEY, algorithms=[ALGORITHM])
         user_id: int = payload.get("user_id")
         email: str = payload.get("email")
         role: str = payload.get("role")
         if user_id is None or email is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        return TokenData(user_id=user_id, email=email, role=role)
-    except JWTError:
+        return TokenData(user_id=user_id, email=email, role=role, exp=payload.get("exp"))
+    except jwt.PyJWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
 # ============================================================================
@@ -366,63 +455,103 @@ def get_db():
     finally:
         db.close()
 
+# Authenticated users keyed by a token digest (raw tokens are never stored).
+# Entries live for 30s but are never served past the token's own expiry.
+_auth_cache = TTLCache(maxsize=10000, ttl=30)
+_auth_cache_lock = threading.Lock()
+_USER_COLUMNS = tuple(attr.key for attr in User.__mapper__.column_attrs)
+
+def invalidate_auth_cache():
+    """Drop cached users; call after a user row changes"""
+    with _auth_cache_lock:
+        _auth_cache.clear()
+
 def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Session = Depends(get_db)) -> User:
+    cache_key = hashlib.sha256(token.encode()).digest()[:16]
+    with _auth_cache_lock:
+        cached = _auth_cache.get(cache_key)
+    if cached is not None and cached[1] > time.time():
+        # Merge the cached row without a SELECT
+        user = User(**cached[0])
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
     token_data = decode_access_token(token)
     user = db.query(User).filter(User.id == token_data.user_id).first()
     if user is None or not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive")
+
+    with _auth_cache_lock:
+        _auth_cache[cache_key] = ({key: getattr(user, key) for key in _USER_COLUMNS}, token_data.exp or 0)
     return user
 
 def require_role(allowed_roles: List[UserRole]):
+    allowed = frozenset(allowed_roles)
+    detail = f"Access denied. Required roles: {', '.join([r.value for r in allowed_roles])}"
+
     def role_checker(current_user: User = Depends(get_current_user)) -> User:
-        if current_user.role not in allowed_roles:
+        if current_user.role not in allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Access denied. Required roles: {', '.join([r.value for r in allowed_roles])}"
+                detail=detail
             )
         return current_user
     return role_checker
 
+# Shared role dependencies, so every endpoint reuses the same callable
+require_hr_admin = require_role([UserRole.HR_ADMIN])
+require_manager_or_hr = require_role([UserRole.MANAGER, UserRole.HR_ADMIN])
+
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
 
+# Holiday dates per year as datetime64 arrays, cleared by invalidate_holiday_cache()
+_holidays_np_cache = LRUCache(maxsize=8)
+_holidays_np_lock = threading.Lock()
+
+def _holidays_np(year: int, db: Session) -> np.ndarray:
+    """Holiday dates of a year as a datetime64 array, filled from the caller's session"""
+    with _holidays_np_lock:
+        cached = _holidays_np_cache.get(year)
+    if cached is not None:
+        return cached
+
+    dates = db.query(Holiday.date).filter(
+        Holiday.date >= date(year, 1, 1),
+        Holiday.date <= date(year, 12, 31)
+    ).all()
+    holidays = np.array([d for (d,) in dates], dtype="datetime64[D]")
+    with _holidays_np_lock:
+        _holidays_np_cache[year] = holidays
+    return holidays
+
 def calculate_working_days(start_date: date, end_date: date, db: Session) -> float:
     """Calculate working days excluding weekends and holidays"""
     if start_date > end_date:
         raise ValueError("Start date must be before end date")
 
-    # Get holidays in the date range
-    holidays = db.query(Holiday).filter(
-        Holiday.date >= start_date,
-        Holiday.date <= end_date
-    ).all()
-    holiday_dates = {h.date for h in holidays}
-
-    working_days = 0
-    current_date = start_date
+    holidays = np.concatenate([_holidays_np(year, db) for year in range(start_date.year, end_date.year + 1)])
 
-    while current_date <= end_date:
-        # Skip weekends (5=Saturday, 6=Sunday)
-        if current_date.weekday() < 5 and current_date not in holiday_dates:
-            working_days += 1
-        current_date += timedelta(days=1)
+    # end date + 1: busday_count's range is half-open
+    working_days = np.busday_count(np.datetime64(start_date), np.datetime64(end_date) + 1, holidays=holidays)
 
     return float(working_days)
 
 def check_overlapping_requests(user_id: int, start_date: date, end_date: date, db: Session, exclude_request_id: Optional[int] = None) -> bool:
     """Check if user has overlapping leave requests"""
-    query = db.query(LeaveRequest).filter(
+    conditions = [
         LeaveRequest.user_id == user_id,
         LeaveRequest.status.in_([RequestStatus.PENDING, RequestStatus.APPROVED]),
         LeaveRequest.start_date <= end_date,
         LeaveRequest.end_date >= start_date
-    )
+    ]
 
     if exclude_request_id:
-        query = query.filter(LeaveRequest.id != exclude_request_id)
+        conditions.append(LeaveRequest.id != exclude_request_id)
 
-    return query.first() is not None
+    # Index-backed EXISTS probe
+    return db.scalar(select(exists().where(*conditions)))
 
 def get_active_delegate(approver_id: int, approval_date: date, db: Session) -> Optional[int]:
     """Get active delegate for an approver on a specific date"""
@@ -439,63 +568,56 @@ def get_active_delegate(approver_id: int, approval_date: date, db: Session) -> O
 # WORKFLOW ENGINE
 # ============================================================================
 
-def create_approval_workflow(leave_request: LeaveRequest, db: Session):
+def get_approval_chain(leave_request: LeaveRequest, db: Session) -> List[int]:
     """
-    Create multi-level approval workflow for a leave request
+    Ordered approver ids for a leave request
     - Employee leaves: Approved by Manager
     - Manager leaves: Approved by HR Admin
     """
     user = leave_request.user
-    approval_level = 1
+    approver_ids = []
 
     # Check if user is a manager
     if user.role == UserRole.MANAGER:
         # Managers' leaves go directly to HR Admin for approval
-        hr_admin = db.query(User).filter(User.role == UserRole.HR_ADMIN, User.is_active == True).first()
-        if hr_admin:
-            workflow = ApprovalWorkflow(
-                leave_request_id=leave_request.id,
-                approver_id=hr_admin.id,
-                approval_level=approval_level,
-                status=ApprovalStatus.PENDING
-            )
-            db.add(workflow)
+        hr_admin_id = db.query(User.id).filter(User.role == UserRole.HR_ADMIN, User.is_active == True).limit(1).scalar()
+        if hr_admin_id:
+            approver_ids.append(hr_admin_id)
     else:
         # Employee leaves: Level 1 - Direct Manager
         if user.manager_id:
-            workflow = ApprovalWorkflow(
-                leave_request_id=leave_request.id,
-                approver_id=user.manager_id,
-                approval_level=approval_level,
-                status=ApprovalStatus.PENDING
-            )
-            db.add(workflow)
-            approval_level += 1
+            approver_ids.append(user.manager_id)
 
             # Level 2: Manager's Manager (if exists)
-            manager = db.query(User).filter(User.id == user.manager_id).first()
-            if manager and manager.manager_id:
-                workflow = ApprovalWorkflow(
-                    leave_request_id=leave_request.id,
-                    approver_id=manager.manager_id,
-                    approval_level=approval_level,
-                    status=ApprovalStatus.PENDING
-                )
-                db.add(workflow)
-                approval_level += 1
+            manager_manager_id = db.query(User.manager_id).filter(User.id == user.manager_id).scalar()
+            if manager_manager_id:
+                approver_ids.append(manager_manager_id)
 
         # Level 3: HR Admin (for leaves > 5 days)
         if leave_request.total_days > 5:
-            hr_admin = db.query(User).filter(User.role == UserRole.HR_ADMIN, User.is_active == True).first()
-            if hr_admin:
-                workflow = ApprovalWorkflow(
-                    leave_request_id=leave_request.id,
-                    approver_id=hr_admin.id,
-                    approval_level=approval_level,
-                    status=ApprovalStatus.PENDING
-                )
-                db.add(workflow)
+            hr_admin_id = db.query(User.id).filter(User.role == UserRole.HR_ADMIN, User.is_active == True).limit(1).scalar()
+            if hr_admin_id:
+                approver_ids.append(hr_admin_id)
+
+    return approver_ids
+
+def insert_approval_levels(leave_request_id: int, approver_ids: List[int], db: Session):
+    """Insert one pending approval level per approver, in order, as a single INSERT"""
+    rows = [
+        {
+            "leave_request_id": leave_request_id,
+            "approver_id": approver_id,
+            "approval_level": level,
+            "status": ApprovalStatus.PENDING
+        }
+        for level, approver_id in enumerate(approver_ids, start=1)
+    ]
+    if rows:
+        db.execute(insert(ApprovalWorkflow), rows)
 
+def create_approval_workflow(leave_request: LeaveRequest, db: Session):
+    """Create multi-level approval workflow for a leave request"""
+    insert_approval_levels(leave_request.id, get_approval_chain(leave_request, db), db)
     db.commit()
 
 def process_approval(leave_request_id: int, approver_id: int, approve: bool, comments: Optional[str], db: Session):
@@ -503,6 +625,7 @@ def process_approval(leave_request_id: int, approver_id: int, approve: bool, com
     leave_request = db.query(LeaveRequest).filter(LeaveRequest.id == leave_request_id).first()
     if not leave_request:
         raise HTTPException(status_code=404, detail="Leave request not found")
+    balance_year = leave_request.start_date.year
 
     # Check for active delegation
     delegate_id = get_active_delegate(approver_id, date.today(), db)
@@ -571,6 +694,7 @@ def process_approval(leave_request_id: int, approver_id: int, approve: bool, com
                 balance.pending_days -= leave_request.total_days
 
     db.commit()
+    invalidate_leave_summary_cache(balance_year)
 
 # ============================================================================
 # API ROUTERS
@@ -583,12 +707,11 @@ auth_router = APIRouter(prefix="/auth", tags=["Authentication"])
 def register_user(
     user_data: UserCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_hr_admin)
 ):
     """Register a new user (HR Admin only)"""
-    # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
+    # Check if email already exists (before paying for the password hash)
+    if db.scalar(select(exists().where(User.email == user_data.email))):
         raise HTTPException(status_code=400, detail="Email already registered")
 
     # Create new user
@@ -602,7 +725,13 @@ def register_user(
         hire_date=date.today()
     )
     db.add(new_user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent registration of the same email
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Email already registered")
+    invalidate_leave_summary_cache()
     db.refresh(new_user)
 
     return new_user
@@ -610,7 +739,8 @@ def register_user(
 @auth_router.post("/login", response_model=Token)
 def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """Login and get JWT token"""
-    user = db.query(User).filter(User.email == form_data.username).first()
+    email = normalize_email(form_data.username)
+    user = db.query(User).filter(User.email == email).first() if email else None
 
     if not user or not verify_password(form_data.password, user.password_hash):
         raise HTTPException(
@@ -639,7 +769,7 @@ users_router = APIRouter(prefix="/users", tags=["Users"])
 @users_router.get("", response_model=List[UserResponse])
 def list_users(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.MANAGER, UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_manager_or_hr)
 ):
     """List all users (Manager/HR Admin only)"""
     if current_user.role == UserRole.MANAGER:
@@ -651,6 +781,9 @@ def list_users(
 
     return users
 
+# Compiled once, cached by SQLAlchemy
+_GET_USER_STMT = lambda_stmt(lambda: select(User).where(User.id == bindparam("user_id")))
+
 @users_router.get("/{user_id}", response_model=UserResponse)
 def get_user(
     user_id: int,
@@ -658,7 +791,7 @@ def get_user(
     current_user: User = Depends(get_current_user)
 ):
     """Get user details"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.scalar(_GET_USER_STMT, {"user_id": user_id})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -693,6 +826,8 @@ def update_user(
         user.manager_id = user_data.manager_id
 
     db.commit()
+    invalidate_auth_cache()
+    invalidate_leave_summary_cache()
     db.refresh(user)
     return user
 
@@ -700,7 +835,7 @@ def update_user(
 def get_team_members(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.MANAGER, UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_manager_or_hr)
 ):
     """Get team members for a manager"""
     # Authorization check
@@ -713,27 +848,29 @@ def get_team_members(
 # Leave Types Router
 leave_types_router = APIRouter(prefix="/leave-types", tags=["Leave Types"])
 
+_ACTIVE_LEAVE_TYPES_STMT = lambda_stmt(lambda: select(LeaveType).where(LeaveType.is_active == True))
+
 @leave_types_router.get("", response_model=List[LeaveTypeResponse])
 def list_leave_types(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """List all active leave types"""
-    leave_types = db.query(LeaveType).filter(LeaveType.is_active == True).all()
+    leave_types = db.scalars(_ACTIVE_LEAVE_TYPES_STMT).all()
     return leave_types
 
 @leave_types_router.post("", response_model=LeaveTypeResponse)
 def create_leave_type(
     leave_type_data: LeaveTypeCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_hr_admin)
 ):
     """Create a new leave type (HR Admin only)"""
-    # Check if leave type already exists
-    existing = db.query(LeaveType).filter(LeaveType.name == leave_type_data.name).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Leave type already exists")
-
     leave_type = LeaveType(**leave_type_data.model_dump())
     db.add(leave_type)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # The unique constraint on name is the existence check
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Leave type already exists")
     db.refresh(leave_type)
     return leave_type
 
@@ -742,7 +879,7 @@ def update_leave_type(
     leave_type_id: int,
     leave_type_data: LeaveTypeUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_hr_admin)
 ):
     """Update a leave type (HR Admin only)"""
     leave_type = db.query(LeaveType).filter(LeaveType.id == leave_type_id).first()
@@ -762,7 +899,7 @@ def update_leave_type(
 def deactivate_leave_type(
     leave_type_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_hr_admin)
 ):
     """Deactivate a leave type (HR Admin only)"""
     leave_type = db.query(LeaveType).filter(LeaveType.id == leave_type_id).first()
@@ -776,6 +913,13 @@ def deactivate_leave_type(
 # Leave Balances Router
 leave_balances_router = APIRouter(prefix="/leave-balances", tags=["Leave Balances"])
 
+_USER_BALANCES_STMT = lambda_stmt(
+    lambda: select(LeaveBalance).options(selectinload(LeaveBalance.leave_type)).where(
+        LeaveBalance.user_id == bindparam("user_id"),
+        LeaveBalance.year == bindparam("year")
+    )
+)
+
 @leave_balances_router.get("/me", response_model=List[LeaveBalanceResponse])
 def get_my_leave_balances(
     db: Session = Depends(get_db),
@@ -783,95 +927,82 @@ def get_my_leave_balances(
 ):
     """Get current user's leave balances"""
     current_year = date.today().year
-    balances = db.query(LeaveBalance).filter(
-        LeaveBalance.user_id == current_user.id,
-        LeaveBalance.year == current_year
-    ).all()
-
-    result = []
-    for balance in balances:
-        result.append(LeaveBalanceResponse(
-            id=balance.id,
-            user_id=balance.user_id,
-            leave_type_id=balance.leave_type_id,
-            leave_type_name=balance.leave_type.name,
-            year=balance.year,
-            total_days=balance.total_days,
-            used_days=balance.used_days,
-            pending_days=balance.pending_days,
-            available_days=balance.available_days
-        ))
+    balances = db.scalars(_USER_BALANCES_STMT, {"user_id": current_user.id, "year": current_year}).all()
 
-    return result
+    return balances
 
 @leave_balances_router.get("/{user_id}", response_model=List[LeaveBalanceResponse])
 def get_user_leave_balances(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.MANAGER, UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_manager_or_hr)
 ):
     """Get user's leave balances (Manager/HR Admin only)"""
     current_year = date.today().year
-    balances = db.query(LeaveBalance).filter(
+    balances = db.query(LeaveBalance).options(
+        selectinload(LeaveBalance.leave_type)
+    ).filter(
         LeaveBalance.user_id == user_id,
         LeaveBalance.year == current_year
     ).all()
 
-    result = []
-    for balance in balances:
-        result.append(LeaveBalanceResponse(
-            id=balance.id,
-            user_id=balance.user_id,
-            leave_type_id=balance.leave_type_id,
-            leave_type_name=balance.leave_type.name,
-            year=balance.year,
-            total_days=balance.total_days,
-            used_days=balance.used_days,
-            pending_days=balance.pending_days,
-            available_days=balance.available_days
-        ))
-
-    return result
+    return balances
 
 @leave_balances_router.post("/initialize/{year}")
 def initialize_leave_balances(
     year: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_hr_admin)
 ):
     """Initialize leave balances for all users for a given year (HR Admin only)"""
-    # Get all active users and leave types
-    users = db.query(User).filter(User.is_active == True).all()
-    leave_types = db.query(LeaveType).filter(LeaveType.is_active == True).all()
-
-    initialized_count = 0
-    for user in users:
-        for leave_type in leave_types:
-            # Check if balance already exists
-            existing = db.query(LeaveBalance).filter(
-                LeaveBalance.user_id == user.id,
-                LeaveBalance.leave_type_id == leave_type.id,
-                LeaveBalance.year == year
-            ).first()
+    # Get all active users and leave types (ids and quotas only)
+    user_ids = [row.id for row in db.query(User).filter(User.is_active == True).with_entities(User.id)]
+    leave_types = db.query(LeaveType).filter(LeaveType.is_active == True).with_entities(
+        LeaveType.id, LeaveType.annual_quota
+    ).all()
 
-            if not existing:
-                balance = LeaveBalance(
-                    user_id=user.id,
-                    leave_type_id=leave_type.id,
-                    year=year,
-                    total_days=leave_type.annual_quota,
-                    used_days=0,
-                    pending_days=0
-                )
-                db.add(balance)
-                initialized_count += 1
+    # Diff against the balances that already exist for the year in one query
+    existing = set(
+        db.query(LeaveBalance.user_id, LeaveBalance.leave_type_id).filter(LeaveBalance.year == year).all()
+    )
+    rows = [
+        {
+            "user_id": user_id,
+            "leave_type_id": leave_type.id,
+            "year": year,
+            "total_days": leave_type.annual_quota,
+            "used_days": 0,
+            "pending_days": 0
+        }
+        for user_id in user_ids
+        for leave_type in leave_types
+        if (user_id, leave_type.id) not in existing
+    ]
 
+    if rows:
+        db.bulk_insert_mappings(LeaveBalance, rows)
     db.commit()
+    invalidate_leave_summary_cache(year)
+    initialized_count = len(rows)
     return {"message": f"Initialized {initialized_count} leave balances for year {year}"}
 
 # Leave Requests Router
 leave_requests_router = APIRouter(prefix="/leave-requests", tags=["Leave Requests"])
 
+# List views load only the columns LeaveRequestResponse renders, and just the
+# names from the joined user and leave type rows (no password hashes etc.)
+LEAVE_REQUEST_LIST_COLUMNS = load_only(
+    LeaveRequest.id, LeaveRequest.user_id, LeaveRequest.leave_type_id,
+    LeaveRequest.start_date, LeaveRequest.end_date, LeaveRequest.total_days,
+    LeaveRequest.reason, LeaveRequest.status, LeaveRequest.created_at, LeaveRequest.updated_at
+)
+LEAVE_REQUEST_LIST_OPTIONS = (
+    LEAVE_REQUEST_LIST_COLUMNS,
+    joinedload(LeaveRequest.user).load_only(User.full_name),
+    joinedload(LeaveRequest.leave_type).load_only(LeaveType.name),
+)
+
+
 @leave_requests_router.post("", response_model=LeaveRequestResponse)
 def create_leave_request(
     request_data: LeaveRequestCreate,
@@ -896,18 +1027,27 @@ def create_leave_request(
     if check_overlapping_requests(current_user.id, request_data.start_date, request_data.end_date, db):
         raise HTTPException(status_code=400, detail="You have an overlapping leave request")
 
-    # Check leave balance
+    # Reserve the days with one conditional UPDATE; the WHERE clause enforces the
+    # available balance, so concurrent submissions cannot oversell it
     current_year = request_data.start_date.year
-    balance = db.query(LeaveBalance).filter(
+    balance_filter = (
         LeaveBalance.user_id == current_user.id,
         LeaveBalance.leave_type_id == request_data.leave_type_id,
         LeaveBalance.year == current_year
-    ).first()
-
-    if not balance:
-        raise HTTPException(status_code=400, detail="Leave balance not found for this year")
+    )
+    reserved = db.execute(
+        update(LeaveBalance).where(
+            *balance_filter,
+            LeaveBalance.available_days >= total_days
+        ).values(
+            pending_days=LeaveBalance.pending_days + total_days
+        ).execution_options(synchronize_session=False)
+    )
 
-    if balance.available_days < total_days:
+    if reserved.rowcount == 0:
+        balance = db.query(LeaveBalance).filter(*balance_filter).first()
+        if not balance:
+            raise HTTPException(status_code=400, detail="Leave balance not found for this year")
         raise HTTPException(
             status_code=400,
             detail=f"Insufficient leave balance. Available: {balance.available_days}, Requested: {total_days}"
@@ -924,105 +1064,91 @@ def create_leave_request(
         status=RequestStatus.PENDING
     )
     db.add(leave_request)
-    db.commit()
-    db.refresh(leave_request)
+    db.flush()
 
-    # Update pending days in balance
-    balance.pending_days += total_days
-
-    # Create approval workflow
+    # Create approval workflow (commits the request, balance and levels together)
     create_approval_workflow(leave_request, db)
+    invalidate_leave_summary_cache(current_year)
 
-    db.commit()
-
-    return LeaveRequestResponse(
-        id=leave_request.id,
-        user_id=leave_request.user_id,
-        user_name=leave_request.user.full_name,
-        leave_type_id=leave_request.leave_type_id,
-        leave_type_name=leave_request.leave_type.name,
-        start_date=leave_request.start_date,
-        end_date=leave_request.end_date,
-        total_days=leave_request.total_days,
-        reason=leave_request.reason,
-        status=leave_request.status,
-        created_at=leave_request.created_at,
-        updated_at=leave_request.updated_at
-    )
+    return leave_request
 
 @leave_requests_router.get("", response_model=List[LeaveRequestResponse])
 def list_leave_requests(
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    before_id: Optional[int] = None,
+    before_created_at: Optional[datetime] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List leave requests (filtered by role)"""
+    """List leave requests (filtered by role), newest first
+
+    Returns every visible request unless a limit is given. Clients that page pass
+    limit, then the created_at and id of the last row seen as before_created_at /
+    before_id to fetch the next page.
+    """
+    # The id only breaks ties within one created_at, so it is meaningless alone
+    if before_id is not None and before_created_at is None:
+        raise HTTPException(status_code=422, detail="before_id requires before_created_at")
+
+    # Join the requester once: it both scopes a manager's team and supplies user_name
+    query = db.query(LeaveRequest).join(User, User.id == LeaveRequest.user_id).options(
+        LEAVE_REQUEST_LIST_COLUMNS,
+        contains_eager(LeaveRequest.user).load_only(User.full_name),
+        joinedload(LeaveRequest.leave_type).load_only(LeaveType.name)
+    )
     if current_user.role == UserRole.HR_ADMIN:
         # HR can see all requests
-        requests = db.query(LeaveRequest).order_by(LeaveRequest.created_at.desc()).all()
+        pass
     elif current_user.role == UserRole.MANAGER:
-        # Managers can see their team's requests
-        team_member_ids = [tm.id for tm in current_user.team_members]
-        team_member_ids.append(current_user.id)  # Include own requests
-        requests = db.query(LeaveRequest).filter(
-            LeaveRequest.user_id.in_(team_member_ids)
-        ).order_by(LeaveRequest.created_at.desc()).all()
+        # Managers can see their team's requests (includes own requests)
+        query = query.filter((User.manager_id == current_user.id) | (User.id == current_user.id))
     else:
         # Employees can only see their own requests
-        requests = db.query(LeaveRequest).filter(
-            LeaveRequest.user_id == current_user.id
-        ).order_by(LeaveRequest.created_at.desc()).all()
-
-    result = []
-    for req in requests:
-        result.append(LeaveRequestResponse(
-            id=req.id,
-            user_id=req.user_id,
-            user_name=req.user.full_name,
-            leave_type_id=req.leave_type_id,
-            leave_type_name=req.leave_type.name,
-            start_date=req.start_date,
-            end_date=req.end_date,
-            total_days=req.total_days,
-            reason=req.reason,
-            status=req.status,
-            created_at=req.created_at,
-            updated_at=req.updated_at
-        ))
+        query = query.filter(LeaveRequest.user_id == current_user.id)
 
-    return result
+    if before_created_at is not None:
+        if before_id is not None:
+            query = query.filter(
+                tuple_(LeaveRequest.created_at, LeaveRequest.id) < tuple_(before_created_at, before_id)
+            )
+        else:
+            query = query.filter(LeaveRequest.created_at < before_created_at)
+
+    query = query.order_by(LeaveRequest.created_at.desc(), LeaveRequest.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    requests = query.all()
+
+    # Names are read through the eager-loaded relationships by the response model's AliasPaths
+    return requests
 
 @leave_requests_router.get("/pending-approvals", response_model=List[LeaveRequestResponse])
 def get_pending_approvals(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.MANAGER, UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_manager_or_hr)
 ):
     """Get leave requests awaiting my approval"""
     # Find pending approvals for current user
-    pending_workflows = db.query(ApprovalWorkflow).filter(
+    pending_workflows = db.query(ApprovalWorkflow).options(
+        joinedload(ApprovalWorkflow.leave_request).options(*LEAVE_REQUEST_LIST_OPTIONS)
+    ).filter(
         ApprovalWorkflow.approver_id == current_user.id,
         ApprovalWorkflow.status == ApprovalStatus.PENDING
     ).all()
 
-    result = []
-    for workflow in pending_workflows:
-        req = workflow.leave_request
-        if req.status == RequestStatus.PENDING:
-            result.append(LeaveRequestResponse(
-                id=req.id,
-                user_id=req.user_id,
-                user_name=req.user.full_name,
-                leave_type_id=req.leave_type_id,
-                leave_type_name=req.leave_type.name,
-                start_date=req.start_date,
-                end_date=req.end_date,
-                total_days=req.total_days,
-                reason=req.reason,
-                status=req.status,
-                created_at=req.created_at,
-                updated_at=req.updated_at
-            ))
+    return [
+        workflow.leave_request
+        for workflow in pending_workflows
+        if workflow.leave_request.status == RequestStatus.PENDING
+    ]
 
-    return result
+# Joins the names the response renders, so serializing it needs no lazy loads
+_GET_LEAVE_REQUEST_STMT = lambda_stmt(
+    lambda: select(LeaveRequest).options(
+        joinedload(LeaveRequest.user),
+        joinedload(LeaveRequest.leave_type)
+    ).where(LeaveRequest.id == bindparam("request_id"))
+)
 
 @leave_requests_router.get("/{request_id}", response_model=LeaveRequestResponse)
 def get_leave_request(
@@ -1031,7 +1157,7 @@ def get_leave_request(
     current_user: User = Depends(get_current_user)
 ):
     """Get leave request details"""
-    leave_request = db.query(LeaveRequest).filter(LeaveRequest.id == request_id).first()
+    leave_request = db.scalar(_GET_LEAVE_REQUEST_STMT, {"request_id": request_id})
     if not leave_request:
         raise HTTPException(status_code=404, detail="Leave request not found")
 
@@ -1039,20 +1165,7 @@ def get_leave_request(
     if current_user.role == UserRole.EMPLOYEE and leave_request.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    return LeaveRequestResponse(
-        id=leave_request.id,
-        user_id=leave_request.user_id,
-        user_name=leave_request.user.full_name,
-        leave_type_id=leave_request.leave_type_id,
-        leave_type_name=leave_request.leave_type.name,
-        start_date=leave_request.start_date,
-        end_date=leave_request.end_date,
-        total_days=leave_request.total_days,
-        reason=leave_request.reason,
-        status=leave_request.status,
-        created_at=leave_request.created_at,
-        updated_at=leave_request.updated_at
-    )
+    return leave_request
 
 @leave_requests_router.put("/{request_id}", response_model=LeaveRequestResponse)
 def update_leave_request(
@@ -1089,21 +1202,24 @@ def update_leave_request(
         if check_overlapping_requests(current_user.id, start_date, end_date, db, exclude_request_id=request_id):
             raise HTTPException(status_code=400, detail="Updated dates overlap with another leave request")
 
-        # Update balance
-        balance = db.query(LeaveBalance).filter(
+        # Swap the old pending days for the new ones in one conditional UPDATE
+        balance_filter = (
             LeaveBalance.user_id == current_user.id,
             LeaveBalance.leave_type_id == leave_request.leave_type_id,
             LeaveBalance.year == start_date.year
-        ).first()
-
-        if balance:
-            # Restore old pending days and add new
-            balance.pending_days -= leave_request.total_days
-
-            if balance.available_days < new_total_days:
-                raise HTTPException(status_code=400, detail="Insufficient leave balance for updated dates")
+        )
+        old_total_days = leave_request.total_days
+        adjusted = db.execute(
+            update(LeaveBalance).where(
+                *balance_filter,
+                LeaveBalance.available_days + old_total_days >= new_total_days
+            ).values(
+                pending_days=LeaveBalance.pending_days - old_total_days + new_total_days
+            ).execution_options(synchronize_session=False)
+        )
 
-            balance.pending_days += new_total_days
+        if adjusted.rowcount == 0 and db.query(LeaveBalance.id).filter(*balance_filter).first():
+            raise HTTPException(status_code=400, detail="Insufficient leave balance for updated dates")
 
         leave_request.start_date = start_date
         leave_request.end_date = end_date
@@ -1114,22 +1230,10 @@ def update_leave_request(
 
     leave_request.updated_at = datetime.utcnow()
     db.commit()
+    invalidate_leave_summary_cache()
     db.refresh(leave_request)
 
-    return LeaveRequestResponse(
-        id=leave_request.id,
-        user_id=leave_request.user_id,
-        user_name=leave_request.user.full_name,
-        leave_type_id=leave_request.leave_type_id,
-        leave_type_name=leave_request.leave_type.name,
-        start_date=leave_request.start_date,
-        end_date=leave_request.end_date,
-        total_days=leave_request.total_days,
-        reason=leave_request.reason,
-        status=leave_request.status,
-        created_at=leave_request.created_at,
-        updated_at=leave_request.updated_at
-    )
+    return leave_request
 
 @leave_requests_router.delete("/{request_id}")
 def cancel_leave_request(
@@ -1138,7 +1242,14 @@ def cancel_leave_request(
     current_user: User = Depends(get_current_user)
 ):
     """Cancel leave request"""
-    leave_request = db.query(LeaveRequest).filter(LeaveRequest.id == request_id).first()
+    # Read only the columns the checks and the balance update need
+    leave_request = db.query(LeaveRequest).filter(LeaveRequest.id == request_id).with_entities(
+        LeaveRequest.user_id,
+        LeaveRequest.leave_type_id,
+        LeaveRequest.status,
+        LeaveRequest.start_date,
+        LeaveRequest.total_days
+    ).first()
     if not leave_request:
         raise HTTPException(status_code=404, detail="Leave request not found")
 
@@ -1153,25 +1264,36 @@ def cancel_leave_request(
     if leave_request.start_date < date.today():
         raise HTTPException(status_code=400, detail="Cannot cancel past leave requests")
 
-    # Update status
+    # Update status, guarded so a concurrent approval/cancel cannot be applied twice
     old_status = leave_request.status
-    leave_request.status = RequestStatus.CANCELLED
-    leave_request.updated_at = datetime.utcnow()
-
-    # Restore balance
-    balance = db.query(LeaveBalance).filter(
-        LeaveBalance.user_id == leave_request.user_id,
-        LeaveBalance.leave_type_id == leave_request.leave_type_id,
-        LeaveBalance.year == leave_request.start_date.year
-    ).first()
+    result = db.execute(
+        update(LeaveRequest).where(
+            LeaveRequest.id == request_id,
+            LeaveRequest.status == old_status
+        ).values(
+            status=RequestStatus.CANCELLED,
+            updated_at=datetime.utcnow()
+        ).execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Cannot cancel this request")
 
-    if balance:
-        if old_status == RequestStatus.PENDING:
-            balance.pending_days -= leave_request.total_days
-        elif old_status == RequestStatus.APPROVED:
-            balance.used_days -= leave_request.total_days
+    # Restore balance in place
+    if old_status == RequestStatus.PENDING:
+        restored = {"pending_days": LeaveBalance.pending_days - leave_request.total_days}
+    else:
+        restored = {"used_days": LeaveBalance.used_days - leave_request.total_days}
+    db.execute(
+        update(LeaveBalance).where(
+            LeaveBalance.user_id == leave_request.user_id,
+            LeaveBalance.leave_type_id == leave_request.leave_type_id,
+            LeaveBalance.year == leave_request.start_date.year
+        ).values(**restored).execution_options(synchronize_session=False)
+    )
 
     db.commit()
+    invalidate_leave_summary_cache(leave_request.start_date.year)
     return {"message": "Leave request cancelled successfully"}
 
 # Approvals Router
@@ -1182,7 +1304,7 @@ def approve_leave_request(
     request_id: int,
     approval_data: ApprovalAction,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.MANAGER, UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_manager_or_hr)
 ):
     """Approve leave request"""
     process_approval(request_id, current_user.id, True, approval_data.comments, db)
@@ -1193,7 +1315,7 @@ def reject_leave_request(
     request_id: int,
     approval_data: ApprovalAction,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.MANAGER, UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_manager_or_hr)
 ):
     """Reject leave request"""
     process_approval(request_id, current_user.id, False, approval_data.comments, db)
@@ -1202,43 +1324,66 @@ def reject_leave_request(
 @approvals_router.get("/my-pending", response_model=List[ApprovalWorkflowResponse])
 def get_my_pending_approvals(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.MANAGER, UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_manager_or_hr)
 ):
     """Get my pending approval tasks"""
-    workflows = db.query(ApprovalWorkflow).filter(
+    workflows = db.query(ApprovalWorkflow).options(
+        joinedload(ApprovalWorkflow.approver)
+    ).filter(
         ApprovalWorkflow.approver_id == current_user.id,
         ApprovalWorkflow.status == ApprovalStatus.PENDING
     ).all()
 
-    result = []
-    for workflow in workflows:
-        result.append(ApprovalWorkflowResponse(
-            id=workflow.id,
-            leave_request_id=workflow.leave_request_id,
-            approver_id=workflow.approver_id,
-            approver_name=workflow.approver.full_name,
-            approval_level=workflow.approval_level,
-            status=workflow.status,
-            comments=workflow.comments,
-            approved_at=workflow.approved_at
-        ))
-
-    return result
+    return workflows
 
 # Holidays Router
 holidays_router = APIRouter(prefix="/holidays", tags=["Holidays"])
 
+# Read-through cache of serialized holiday lists, keyed by "all" or year.
+# Holidays change rarely; every mutating endpoint below clears it.
+_holiday_cache = TTLCache(maxsize=64, ttl=3600)
+_holiday_cache_lock = threading.Lock()
+_holiday_list_adapter = TypeAdapter(List[HolidayResponse])
+
+def invalidate_holiday_cache():
+    """Drop cached holiday lists; call after any holiday is created, changed or removed"""
+    with _holiday_cache_lock:
+        _holiday_cache.clear()
+    with _holidays_np_lock:
+        _holidays_np_cache.clear()
+
+def cached_holidays_response(key, query, if_none_match: Optional[str]) -> Response:
+    """Serve a holiday query as precomputed JSON bytes, or 304 when the client's ETag matches"""
+    with _holiday_cache_lock:
+        cached = _holiday_cache.get(key)
+    if cached is None:
+        holidays = _holiday_list_adapter.validate_python(query.order_by(Holiday.date).all())
+        payload = _holiday_list_adapter.dump_json(holidays)
+        etag = f'"{hashlib.blake2s(payload, digest_size=8).hexdigest()}"'
+        cached = (payload, etag)
+        with _holiday_cache_lock:
+            _holiday_cache[key] = cached
+
+    payload, etag = cached
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=60"}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
+
 @holidays_router.get("", response_model=List[HolidayResponse])
-def list_holidays(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def list_holidays(
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
     """List all holidays"""
-    holidays = db.query(Holiday).order_by(Holiday.date).all()
-    return holidays
+    return cached_holidays_response("all", db.query(Holiday), if_none_match)
 
 @holidays_router.post("", response_model=HolidayResponse)
 def create_holiday(
     holiday_data: HolidayCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_hr_admin)
 ):
     """Create a new holiday (HR Admin only)"""
     holiday = Holiday(
@@ -1249,6 +1394,7 @@ def create_holiday(
     )
     db.add(holiday)
     db.commit()
+    invalidate_holiday_cache()
     db.refresh(holiday)
     return holiday
 
@@ -1257,7 +1403,7 @@ def update_holiday(
     holiday_id: int,
     holiday_data: HolidayUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_hr_admin)
 ):
     """Update a holiday (HR Admin only)"""
     holiday = db.query(Holiday).filter(Holiday.id == holiday_id).first()
@@ -1269,6 +1415,7 @@ def update_holiday(
         setattr(holiday, field, value)
 
     db.commit()
+    invalidate_holiday_cache()
     db.refresh(holiday)
     return holiday
 
@@ -1276,7 +1423,7 @@ def update_holiday(
 def delete_holiday(
     holiday_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_hr_admin)
 ):
     """Delete a holiday (HR Admin only)"""
     holiday = db.query(Holiday).filter(Holiday.id == holiday_id).first()
@@ -1285,11 +1432,13 @@ def delete_holiday(
 
     db.delete(holiday)
     db.commit()
+    invalidate_holiday_cache()
     return {"message": "Holiday deleted successfully"}
 
 @holidays_router.get("/{year}", response_model=List[HolidayResponse])
 def get_holidays_by_year(
     year: int,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -1297,12 +1446,10 @@ def get_holidays_by_year(
     start_date = date(year, 1, 1)
     end_date = date(year, 12, 31)
 
-    holidays = db.query(Holiday).filter(
+    return cached_holidays_response(year, db.query(Holiday).filter(
         Holiday.date >= start_date,
         Holiday.date <= end_date
-    ).order_by(Holiday.date).all()
-
-    return holidays
+    ), if_none_match)
 
 # Delegations Router
 delegations_router = APIRouter(prefix="/delegations", tags=["Delegations"])
@@ -1311,7 +1458,7 @@ delegations_router = APIRouter(prefix="/delegations", tags=["Delegations"])
 def create_delegation(
     delegation_data: DelegationCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.MANAGER, UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_manager_or_hr)
 ):
     """Create a delegation"""
     # Validate dates
@@ -1335,53 +1482,36 @@ def create_delegation(
     db.commit()
     db.refresh(delegation)
 
-    return DelegationResponse(
-        id=delegation.id,
-        delegator_id=delegation.delegator_id,
-        delegator_name=delegation.delegator.full_name,
-        delegate_id=delegation.delegate_id,
-        delegate_name=delegation.delegate.full_name,
-        start_date=delegation.start_date,
-        end_date=delegation.end_date,
-        is_active=delegation.is_active
-    )
+    return delegation
 
 @delegations_router.get("/active", response_model=List[DelegationResponse])
 def get_active_delegations(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.MANAGER, UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_manager_or_hr)
 ):
     """Get active delegations"""
     today = date.today()
 
     # Get delegations where current user is delegator or delegate
-    delegations = db.query(Delegation).filter(
+    # Every row references current_user on one side, so batch the user lookups
+    # (deduplicated, one IN query per side) rather than joining users twice per row
+    delegations = db.query(Delegation).options(
+        selectinload(Delegation.delegator),
+        selectinload(Delegation.delegate)
+    ).filter(
         Delegation.is_active == True,
         Delegation.start_date <= today,
         Delegation.end_date >= today,
         (Delegation.delegator_id == current_user.id) | (Delegation.delegate_id == current_user.id)
     ).all()
 
-    result = []
-    for delegation in delegations:
-        result.append(DelegationResponse(
-            id=delegation.id,
-            delegator_id=delegation.delegator_id,
-            delegator_name=delegation.delegator.full_name,
-            delegate_id=delegation.delegate_id,
-            delegate_name=delegation.delegate.full_name,
-            start_date=delegation.start_date,
-            end_date=delegation.end_date,
-            is_active=delegation.is_active
-        ))
-
-    return result
+    return delegations
 
 @delegations_router.delete("/{delegation_id}")
 def cancel_delegation(
     delegation_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.MANAGER, UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_manager_or_hr)
 ):
     """Cancel a delegation"""
     delegation = db.query(Delegation).filter(Delegation.id == delegation_id).first()
@@ -1399,116 +1529,185 @@ def cancel_delegation(
 # Reports Router
 reports_router = APIRouter(prefix="/reports", tags=["Reports"])
 
-@reports_router.get("/team-calendar")
+# Reports return plain dicts; declaring response_model=dict routes them through
+# Pydantic's native JSON serializer instead of jsonable_encoder + json.dumps.
+# The unbounded row reports are streamed instead (see stream_report below).
+
+# Leave summaries by year. Past years barely change, so they live for a day; the
+# current (and future) years only for a minute. Balance and user writes clear them.
+_past_leave_summary_cache = TTLCache(maxsize=16, ttl=24 * 3600)
+_current_leave_summary_cache = TTLCache(maxsize=4, ttl=60)
+_leave_summary_cache_lock = threading.Lock()
+
+def invalidate_leave_summary_cache(year: Optional[int] = None):
+    """Drop the cached summary for a year, or every year when none is given"""
+    with _leave_summary_cache_lock:
+        for cache in (_past_leave_summary_cache, _current_leave_summary_cache):
+            if year is None:
+                cache.clear()
+            else:
+                cache.pop(year, None)
+
+@reports_router.get("/team-calendar", response_model=dict)
 def get_team_calendar(
     start_date: date,
     end_date: date,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.MANAGER, UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_manager_or_hr)
 ):
     """Get team leave calendar view"""
-    if current_user.role == UserRole.MANAGER:
-        team_member_ids = [tm.id for tm in current_user.team_members]
-        team_member_ids.append(current_user.id)
-    else:
-        # HR can see all
-        team_member_ids = [u.id for u in db.query(User).filter(User.is_active == True).all()]
-
-    leave_requests = db.query(LeaveRequest).filter(
-        LeaveRequest.user_id.in_(team_member_ids),
+    # Project just the rendered columns (names via JOIN), no ORM objects per row
+    stmt = select(
+        LeaveRequest.user_id,
+        User.full_name.label("user_name"),
+        LeaveType.name.label("leave_type"),
+        LeaveRequest.start_date,
+        LeaveRequest.end_date,
+        LeaveRequest.total_days
+    ).join(User, User.id == LeaveRequest.user_id).join(
+        LeaveType, LeaveType.id == LeaveRequest.leave_type_id
+    ).where(
         LeaveRequest.status == RequestStatus.APPROVED,
         LeaveRequest.start_date <= end_date,
         LeaveRequest.end_date >= start_date
-    ).all()
+    )
+
+    if current_user.role == UserRole.MANAGER:
+        stmt = stmt.where((User.manager_id == current_user.id) | (User.id == current_user.id))
+    else:
+        # HR can see all
+        stmt = stmt.where(User.is_active == True)
 
-    calendar = []
-    for req in leave_requests:
-        calendar.append({
-            "user_id": req.user_id,
-            "user_name": req.user.full_name,
-            "leave_type": req.leave_type.name,
-            "start_date": req.start_date,
-            "end_date": req.end_date,
-            "total_days": req.total_days
-        })
+    calendar = [dict(row) for row in db.execute(stmt).mappings()]
 
     return {"calendar": calendar}
 
-@reports_router.get("/leave-summary")
+@reports_router.get("/leave-summary", response_model=dict)
 def get_leave_summary(
     year: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_hr_admin)
 ):
     """Get leave usage summary by department (HR Admin only)"""
-    users = db.query(User).filter(User.is_active == True).all()
-
-    summary = {}
-    for user in users:
-        dept = user.department or "Unassigned"
-        if dept not in summary:
-            summary[dept] = {
-                "total_employees": 0,
-                "total_used_days": 0,
-                "total_pending_days": 0
-            }
-
-        summary[dept]["total_employees"] += 1
-
-        balances = db.query(LeaveBalance).filter(
-            LeaveBalance.user_id == user.id,
-            LeaveBalance.year == year
-        ).all()
+    cache = _past_leave_summary_cache if year < date.today().year else _current_leave_summary_cache
+    with _leave_summary_cache_lock:
+        cached = cache.get(year)
+    if cached is not None:
+        return cached
+
+    # One aggregate over active users and their balances for the year; departments
+    # are bucketed in SQL (NULL or blank -> "Unassigned") so each row is already
+    # one final summary entry
+    department = func.coalesce(func.nullif(User.department, ""), "Unassigned")
+    rows = db.query(
+        department,
+        func.count(User.id.distinct()),
+        func.coalesce(func.sum(LeaveBalance.used_days), 0),
+        func.coalesce(func.sum(LeaveBalance.pending_days), 0)
+    ).outerjoin(
+        LeaveBalance, and_(LeaveBalance.user_id == User.id, LeaveBalance.year == year)
+    ).filter(
+        User.is_active == True
+    ).group_by(department).all()
+
+    summary = {
+        dept: {
+            "total_employees": employees,
+            "total_used_days": used_days,
+            "total_pending_days": pending_days
+        }
+        for dept, employees, used_days, pending_days in rows
+    }
 
-        for balance in balances:
-            summary[dept]["total_used_days"] += balance.used_days
-            summary[dept]["total_pending_days"] += balance.pending_days
+    result = {"year": year, "summary": summary}
+    with _leave_summary_cache_lock:
+        cache[year] = result
+    return result
 
-    return {"year": year, "summary": summary}
+# Rows fetched (and serialized) per round trip by the streamed reports
+REPORT_STREAM_BATCH_SIZE = 500
+
+def stream_report(head: dict, key: str, batches: Iterator[List[dict]]) -> StreamingResponse:
+    """
+    Stream a report as the JSON object head + {key: [rows...]}, writing each batch
+    of rows as soon as it is produced rather than building the whole list first
+
+    The batches should read from the request's own session: FastAPI (>= 0.118)
+    closes yield dependencies only after the body has been sent, so it stays open.
+    """
+    # Run the query and fetch the first batch before any byte is sent, so a failing
+    # query surfaces as a normal error response rather than a 200 with a broken body
+    batches = iter(batches)
+    first_batch = next(batches, [])
+
+    def body():
+        yield to_json(head)[:-1] + (b"," if head else b"") + b'"' + key.encode() + b'":['
+        separator = b""
+        # An error past this point propagates before the closing "]}" is written, so
+        # the server aborts the response and clients never see a complete document
+        for batch in itertools.chain((first_batch,), batches):
+            if batch:
+                yield separator + b",".join(to_json(row) for row in batch)
+                separator = b","
+        yield b"]}"
+
+    return StreamingResponse(body(), media_type="application/json")
 
 @reports_router.get("/pending-requests")
 def get_all_pending_requests(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_hr_admin)
 ):
     """Get all pending leave requests (HR Admin only)"""
-    requests = db.query(LeaveRequest).filter(
+    requests_stmt = select(
+        LeaveRequest.id.label("request_id"),
+        User.full_name.label("user_name"),
+        LeaveType.name.label("leave_type"),
+        LeaveRequest.start_date,
+        LeaveRequest.end_date,
+        LeaveRequest.total_days,
+        LeaveRequest.created_at
+    ).join(User, User.id == LeaveRequest.user_id).join(
+        LeaveType, LeaveType.id == LeaveRequest.leave_type_id
+    ).where(
         LeaveRequest.status == RequestStatus.PENDING
-    ).order_by(LeaveRequest.created_at).all()
-
-    result = []
-    for req in requests:
-        # Get approval workflow
-        workflows = db.query(ApprovalWorkflow).filter(
-            ApprovalWorkflow.leave_request_id == req.id
-        ).order_by(ApprovalWorkflow.approval_level).all()
-
-        result.append({
-            "request_id": req.id,
-            "user_name": req.user.full_name,
-            "leave_type": req.leave_type.name,
-            "start_date": req.start_date,
-            "end_date": req.end_date,
-            "total_days": req.total_days,
-            "created_at": req.created_at,
-            "approval_workflow": [
-                {
-                    "level": w.approval_level,
-                    "approver": w.approver.full_name,
-                    "status": w.status.value
-                }
-                for w in workflows
+    ).order_by(LeaveRequest.created_at).execution_options(yield_per=REPORT_STREAM_BATCH_SIZE)
+
+    def batches():
+        for requests in db.execute(requests_stmt).mappings().partitions():
+            # One projected query for the approval levels of each batch of requests
+            workflows = db.execute(
+                select(
+                    ApprovalWorkflow.leave_request_id,
+                    ApprovalWorkflow.approval_level,
+                    User.full_name,
+                    ApprovalWorkflow.status
+                ).join(User, User.id == ApprovalWorkflow.approver_id).where(
+                    ApprovalWorkflow.leave_request_id.in_([req["request_id"] for req in requests])
+                ).order_by(ApprovalWorkflow.leave_request_id, ApprovalWorkflow.approval_level)
+            )
+
+            levels_by_request = {}
+            for leave_request_id, level, approver, workflow_status in workflows:
+                levels_by_request.setdefault(leave_request_id, []).append({
+                    "level": level,
+                    "approver": approver,
+                    "status": workflow_status.value
+                })
+
+            yield [
+                {**req, "approval_workflow": levels_by_request.get(req["request_id"], [])}
+                for req in requests
             ]
-        })
 
-    return {"pending_requests": result}
+    return stream_report({}, "pending_requests", batches())
 
 @reports_router.get("/user-leave-history/{user_id}")
 def get_user_leave_history(
     user_id: int,
     year: Optional[int] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.MANAGER, UserRole.HR_ADMIN]))
+    current_user: User = Depends(require_manager_or_hr)
 ):
     """Get user's leave history"""
     if not year:
@@ -1517,25 +1716,25 @@ def get_user_leave_history(
     start_date = date(year, 1, 1)
     end_date = date(year, 12, 31)
 
-    requests = db.query(LeaveRequest).filter(
+    history_stmt = select(
+        LeaveRequest.id.label("request_id"),
+        LeaveType.name.label("leave_type"),
+        LeaveRequest.start_date,
+        LeaveRequest.end_date,
+        LeaveRequest.total_days,
+        LeaveRequest.status,
+        LeaveRequest.reason
+    ).join(LeaveType, LeaveType.id == LeaveRequest.leave_type_id).where(
         LeaveRequest.user_id == user_id,
         LeaveRequest.start_date >= start_date,
         LeaveRequest.end_date <= end_date
-    ).order_by(LeaveRequest.start_date).all()
-
-    history = []
-    for req in requests:
-        history.append({
-            "request_id": req.id,
-            "leave_type": req.leave_type.name,
-            "start_date": req.start_date,
-            "end_date": req.end_date,
-            "total_days": req.total_days,
-            "status": req.status.value,
-            "reason": req.reason
-        })
-
-    return {"user_id": user_id, "year": year, "history": history}
+    ).order_by(LeaveRequest.start_date).execution_options(yield_per=REPORT_STREAM_BATCH_SIZE)
+
+    def batches():
+        for rows in db.execute(history_stmt).mappings().partitions():
+            yield [{**row, "status": row["status"].value} for row in rows]
+
+    return stream_report({"user_id": user_id, "year": year}, "history", batches())
 
 # ============================================================================
 # SEED DATA
@@ -1544,8 +1743,7 @@ def get_user_leave_history(
 def seed_data(db: Session):
     """Initialize database with default data"""
     # Check if data already exists
-    existing_user = db.query(User).first()
-    if existing_user:
+    if db.query(User.id).limit(1).scalar() is not None:
         return
 
     print("Seeding database with initial data...")
@@ -1554,39 +1752,32 @@ def seed_data(db: Session):
     hr_admin = User(
         email="admin@company.com",
         full_name="HR Administrator",
-        password_hash=get_password_hash("admin123"),
+        password_hash=get_password_hash("admin123", rounds=SEED_BCRYPT_ROUNDS),
         role=UserRole.HR_ADMIN,
         department="Human Resources",
         hire_date=date(2020, 1, 1)
     )
-    db.add(hr_admin)
-    db.commit()
-    db.refresh(hr_admin)
 
     # Create sample manager
     manager = User(
         email="manager@company.com",
         full_name="John Manager",
-        password_hash=get_password_hash("manager123"),
+        password_hash=get_password_hash("manager123", rounds=SEED_BCRYPT_ROUNDS),
         role=UserRole.MANAGER,
         department="Engineering",
         hire_date=date(2021, 1, 1)
     )
-    db.add(manager)
-    db.commit()
-    db.refresh(manager)
 
     # Create sample employee
     employee = User(
         email="employee@company.com",
         full_name="Jane Employee",
-        password_hash=get_password_hash("employee123"),
+        password_hash=get_password_hash("employee123", rounds=SEED_BCRYPT_ROUNDS),
         role=UserRole.EMPLOYEE,
-        manager_id=manager.id,
+        manager=manager,
         department="Engineering",
         hire_date=date(2022, 6, 1)
     )
-    db.add(employee)
 
     # Create default leave types
     leave_types_data = [
@@ -1596,30 +1787,27 @@ def seed_data(db: Session):
         {"name": "Bereavement Leave", "annual_quota": 3, "requires_documentation": True, "is_paid": True},
         {"name": "Unpaid Leave", "annual_quota": 30, "requires_documentation": False, "is_paid": False},
     ]
+    leave_types = [LeaveType(**lt_data) for lt_data in leave_types_data]
 
-    leave_types = []
-    for lt_data in leave_types_data:
-        leave_type = LeaveType(**lt_data)
-        db.add(leave_type)
-        leave_types.append(leave_type)
-
-    db.commit()
+    users = [hr_admin, manager, employee]
+    db.add_all(users + leave_types)
+    # Assign ids for the rows below without committing
+    db.flush()
 
     # Initialize leave balances for current year
     current_year = date.today().year
-    users = [hr_admin, manager, employee]
-
-    for user in users:
-        for leave_type in leave_types:
-            balance = LeaveBalance(
-                user_id=user.id,
-                leave_type_id=leave_type.id,
-                year=current_year,
-                total_days=leave_type.annual_quota,
-                used_days=0,
-                pending_days=0
-            )
-            db.add(balance)
+    db.bulk_insert_mappings(LeaveBalance, [
+        {
+            "user_id": user.id,
+            "leave_type_id": leave_type.id,
+            "year": current_year,
+            "total_days": leave_type.annual_quota,
+            "used_days": 0,
+            "pending_days": 0
+        }
+        for user in users
+        for leave_type in leave_types
+    ])
 
     # Add some sample holidays
     holidays_data = [
@@ -1628,15 +1816,10 @@ def seed_data(db: Session):
         {"name": "Thanksgiving", "date": date(current_year, 11, 28)},
         {"name": "Christmas", "date": date(current_year, 12, 25)},
     ]
-
-    for holiday_data in holidays_data:
-        holiday = Holiday(
-            name=holiday_data["name"],
-            date=holiday_data["date"],
-            is_mandatory=True,
-            created_by=hr_admin.id
-        )
-        db.add(holiday)
+    db.bulk_insert_mappings(Holiday, [
+        {**holiday_data, "is_mandatory": True, "created_by": hr_admin.id}
+        for holiday_data in holidays_data
+    ])
 
     db.commit()
     print("Database seeded successfully!")
@@ -1658,7 +1841,8 @@ app = FastAPI(
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with specific origins
+    allow_origins=list(CORS_ORIGINS),
+    allow_origin_regex=CORS_ORIGIN_REGEX,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -1678,12 +1862,18 @@ app.include_router(reports_router)
 @app.on_event("startup")
 def startup_event():
     """Initialize database and seed data on startup"""
-    Base.metadata.create_all(bind=engine)
-    db = SessionLocal()
-    try:
-        seed_data(db)
-    finally:
-        db.close()
+    # Sync endpoints run in AnyIO's worker threads; match that pool to the DB
+    # connection pool so concurrent requests never outnumber the connections they need
+    anyio.to_thread.current_default_thread_limiter().total_tokens = DB_POOL_SIZE + DB_MAX_OVERFLOW
+
+    if RUN_MIGRATIONS:
+        run_migrations(Base.metadata)
+    if SEED_DB:
+        db = SessionLocal()
+        try:
+            seed_data(db)
+        finally:
+            db.close()
 
 @app.get("/")
 def root():
@@ -3,8 +3,8 @@ Main FastAPI application
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .config import CORS_ORIGINS
-from .database import engine, Base, SessionLocal
+from .config import CORS_ORIGINS, CORS_ORIGIN_REGEX, RUN_MIGRATIONS, SEED_DB
+from .database import Base, SessionLocal, run_migrations
 from .routers import (
     auth_router,
     users_router,
@@ -29,7 +29,8 @@ app = FastAPI(
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=CORS_ORIGINS,
+    allow_origins=list(CORS_ORIGINS),
+    allow_origin_regex=CORS_ORIGIN_REGEX,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -50,12 +51,14 @@ app.include_router(reports_router)
 @app.on_event("startup")
 def startup_event():
     """Initialize database and seed data on startup"""
-    Base.metadata.create_all(bind=engine)
-    db = SessionLocal()
-    try:
-        seed_database(db)
-    finally:
-        db.close()
+    if RUN_MIGRATIONS:
+        run_migrations(Base.metadata)
+    if SEED_DB:
+        db = SessionLocal()
+        try:
+            seed_database(db)
+        finally:
+            db.close()
 
 
 @app.get("/")
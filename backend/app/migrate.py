@@ -0,0 +1,15 @@
+"""
+Create the schema and apply data migrations for the database run.py serves.
+
+Run once per deploy from the backend directory when the app itself starts with
+RUN_MIGRATIONS=0:
+
+    python -m app.migrate
+"""
+from .database import run_migrations
+from .legacy_main import Base
+
+
+if __name__ == "__main__":
+    run_migrations(Base.metadata)
+    print("Database schema is up to date")
@@ -1,7 +1,7 @@
 """
 Delegation model
 """
-from sqlalchemy import Column, Integer, Boolean, Date, ForeignKey
+from sqlalchemy import Column, Integer, Boolean, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 
@@ -9,6 +9,10 @@ from ..database import Base
 class Delegation(Base):
     """Approval authority delegation"""
     __tablename__ = "delegations"
+    __table_args__ = (
+        # Serves the per-approval active delegate lookup in get_active_delegate
+        Index("ix_delegation_active", "delegator_id", "is_active", "start_date", "end_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     delegator_id = Column(Integer, ForeignKey("users.id"), nullable=False)
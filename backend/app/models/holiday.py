@@ -1,7 +1,7 @@
 """
 Holiday model
 """
-from sqlalchemy import Column, Integer, String, Boolean, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 
@@ -9,6 +9,9 @@ from ..database import Base
 class Holiday(Base):
     """Company holidays"""
     __tablename__ = "holidays"
+    __table_args__ = (
+        Index("ix_hol_date", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
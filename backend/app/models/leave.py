@@ -1,9 +1,8 @@
 """
 Leave-related models
 """
-from sqlalchemy import Column, Integer, String, Float, Boolean, Date, DateTime, ForeignKey, Enum as SQLEnum
-from sqlalchemy.orm import relationship
-from datetime import datetime
+from sqlalchemy import Column, Integer, String, Float, Boolean, Date, DateTime, ForeignKey, CheckConstraint, Index, func, text
+from sqlalchemy.orm import relationship, column_property
 from ..database import Base
 from ..schemas.enums import RequestStatus, ApprovalStatus
 
@@ -11,6 +10,9 @@ from ..schemas.enums import RequestStatus, ApprovalStatus
 class LeaveType(Base):
     """Different types of leaves (Annual, Sick, etc.)"""
     __tablename__ = "leave_types"
+    __table_args__ = (
+        Index("ix_leave_types_active", "id", sqlite_where=text("is_active = 1")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, nullable=False)
@@ -35,20 +37,30 @@ class LeaveBalance(Base):
     total_days = Column(Float, nullable=False)
     used_days = Column(Float, default=0)
     pending_days = Column(Float, default=0)
+    # Computed by the database in the same SELECT; also usable in filters
+    available_days = column_property(total_days - used_days - pending_days)
 
     # Relationships
     user = relationship("User", back_populates="leave_balances")
     leave_type = relationship("LeaveType", back_populates="leave_balances")
 
-    @property
-    def available_days(self) -> float:
-        """Calculate available leave days"""
-        return self.total_days - self.used_days - self.pending_days
-
 
 class LeaveRequest(Base):
     """Leave request submitted by employees"""
     __tablename__ = "leave_requests"
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ({})".format(", ".join(f"'{s.value}'" for s in RequestStatus)),
+            name="ck_leave_requests_status"
+        ),
+        # Serve the newest-first keyset pages, check_overlapping_requests,
+        # the status-ordered pending scan and the per-user date range reports
+        Index("ix_leave_requests_created_at_id", "created_at", "id"),
+        Index("ix_leave_requests_user_created", "user_id", "created_at"),
+        Index("ix_leave_requests_user_status_dates", "user_id", "status", "start_date", "end_date"),
+        Index("ix_leave_requests_status_created", "status", "created_at"),
+        Index("ix_leave_requests_user_dates", "user_id", "start_date", "end_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -57,25 +69,36 @@ class LeaveRequest(Base):
     end_date = Column(Date, nullable=False)
     total_days = Column(Float, nullable=False)
     reason = Column(String, nullable=True)
-    status = Column(SQLEnum(RequestStatus), default=RequestStatus.PENDING)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    status = Column(String(16), default=RequestStatus.PENDING.value)
+    created_at = Column(DateTime, default=func.current_timestamp())
+    updated_at = Column(DateTime, default=func.current_timestamp(), onupdate=func.current_timestamp())
 
     # Relationships
     user = relationship("User", back_populates="leave_requests")
     leave_type = relationship("LeaveType", back_populates="leave_requests")
-    approval_workflow = relationship("ApprovalWorkflow", back_populates="leave_request")
+    approval_workflow = relationship(
+        "ApprovalWorkflow", back_populates="leave_request", order_by="ApprovalWorkflow.approval_level"
+    )
 
 
 class ApprovalWorkflow(Base):
     """Multi-level approval workflow for leave requests"""
     __tablename__ = "approval_workflow"
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ({})".format(", ".join(f"'{s.value}'" for s in ApprovalStatus)),
+            name="ck_approval_workflow_status"
+        ),
+        # Serve the level and approver lookups in process_approval
+        Index("ix_aw_req_level_status", "leave_request_id", "approval_level", "status"),
+        Index("ix_aw_req_approver_status", "leave_request_id", "approver_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     leave_request_id = Column(Integer, ForeignKey("leave_requests.id"), nullable=False)
     approver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     approval_level = Column(Integer, nullable=False)
-    status = Column(SQLEnum(ApprovalStatus), default=ApprovalStatus.PENDING)
+    status = Column(String(16), default=ApprovalStatus.PENDING.value)
     comments = Column(String, nullable=True)
     approved_at = Column(DateTime, nullable=True)
 
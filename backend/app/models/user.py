@@ -1,9 +1,8 @@
 """
 User model
 """
-from sqlalchemy import Column, Integer, String, Boolean, Date, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Boolean, Date, ForeignKey, CheckConstraint, Index, func, text
 from sqlalchemy.orm import relationship
-from datetime import date
 from ..database import Base
 from ..schemas.enums import UserRole
 
@@ -11,18 +10,30 @@ from ..schemas.enums import UserRole
 class User(Base):
     """User model for employees, managers, and HR admins"""
     __tablename__ = "users"
+    __table_args__ = (
+        CheckConstraint(
+            "role IN ({})".format(", ".join(f"'{r.value}'" for r in UserRole)),
+            name="ck_users_role"
+        ),
+        # Partial indexes over active users only, for the team and active-user filters
+        Index("ix_users_active_manager", "manager_id", sqlite_where=text("is_active = 1")),
+        Index("ix_users_active", "id", sqlite_where=text("is_active = 1")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
     full_name = Column(String, nullable=False)
     password_hash = Column(String, nullable=False)
-    role = Column(SQLEnum(UserRole), default=UserRole.EMPLOYEE, nullable=False)
+    role = Column(String(16), default=UserRole.EMPLOYEE.value, nullable=False)
     manager_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     department = Column(String, nullable=True)
-    hire_date = Column(Date, default=date.today)
+    hire_date = Column(Date, default=func.current_date())
     is_active = Column(Boolean, default=True)
 
     # Relationships
-    manager = relationship("User", remote_side=[id], backref="team_members")
-    leave_balances = relationship("LeaveBalance", back_populates="user")
-    leave_requests = relationship("LeaveRequest", back_populates="user")
+    # The collections are never read implicitly: callers query by manager_id / user_id
+    # (or opt in with selectinload), so a stray lazy load raises instead of adding N+1 queries
+    manager = relationship("User", remote_side=[id], back_populates="team_members")
+    team_members = relationship("User", back_populates="manager", lazy="raise")
+    leave_balances = relationship("LeaveBalance", back_populates="user", lazy="raise")
+    leave_requests = relationship("LeaveRequest", back_populates="user", lazy="raise")
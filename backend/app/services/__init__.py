@@ -1,14 +1,20 @@
 """
 Business logic services
 """
-from .auth_service import get_current_user, require_role
-from .leave_service import create_approval_workflow, process_approval
+from .auth_service import get_current_user, require_role, invalidate_user_cache
+from .leave_service import (
+    create_approval_workflow,
+    process_approval,
+    invalidate_hr_admin_cache,
+)
 from .seed_service import seed_database
 
 __all__ = [
     "get_current_user",
     "require_role",
+    "invalidate_user_cache",
     "create_approval_workflow",
     "process_approval",
+    "invalidate_hr_admin_cache",
     "seed_database",
 ]
@@ -1,11 +1,14 @@
 """
 Authentication service
 """
-from typing import List, Annotated
+import threading
+from typing import List, Annotated, Optional
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from ..database import get_db
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+from ..database import get_db, run_after_commit
 from ..models import User
 from ..schemas import UserRole
 from ..utils.auth import decode_access_token
@@ -13,6 +16,30 @@ from ..utils.auth import decode_access_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Column snapshots of recently authenticated active users, keyed by user id
+_user_cache = TTLCache(maxsize=5000, ttl=15)
+_user_cache_lock = threading.Lock()
+_USER_COLUMNS = tuple(attr.key for attr in User.__mapper__.column_attrs)
+
+
+def invalidate_user_cache(user_id: Optional[int] = None):
+    """
+    Drop cached users; call after updating or deactivating a user
+    """
+    with _user_cache_lock:
+        if user_id is None:
+            _user_cache.clear()
+        else:
+            _user_cache.pop(user_id, None)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target):
+    """Role changes, deactivation and other edits must not be served from the cache"""
+    user_id = target.id
+    run_after_commit(object_session(target), ("user", user_id), lambda: invalidate_user_cache(user_id))
+
 
 def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
@@ -22,6 +49,15 @@ def get_current_user(
     Get the current authenticated user from JWT token
     """
     token_data = decode_access_token(token)
+
+    with _user_cache_lock:
+        snapshot = _user_cache.get(token_data.user_id)
+    if snapshot is not None:
+        # Attach the cached row to this session as a clean instance, without a SELECT
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
     user = db.query(User).filter(User.id == token_data.user_id).first()
 
     if user is None or not user.is_active:
@@ -30,6 +66,9 @@ def get_current_user(
             detail="User not found or inactive"
         )
 
+    with _user_cache_lock:
+        _user_cache[user.id] = {key: getattr(user, key) for key in _USER_COLUMNS}
+
     return user
 
 
@@ -37,11 +76,14 @@ def require_role(allowed_roles: List[UserRole]):
     """
     Dependency to check if user has required role
     """
+    allowed = frozenset(allowed_roles)
+    detail = f"Access denied. Required roles: {', '.join(r.value for r in allowed_roles)}"
+
     def role_checker(current_user: User = Depends(get_current_user)) -> User:
-        if current_user.role not in allowed_roles:
+        if current_user.role not in allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Access denied. Required roles: {', '.join([r.value for r in allowed_roles])}"
+                detail=detail
             )
         return current_user
     return role_checker
@@ -1,81 +1,157 @@
 """
 Leave management service
 """
+import threading
 from datetime import datetime, date
 from typing import Optional
+from cachetools import TTLCache
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, event, inspect, lambda_stmt, select, update
+from sqlalchemy.orm import Session, aliased, joinedload, object_session, raiseload
+from ..config import STRICT_LOADING
+from ..database import run_after_commit
 from ..models import User, LeaveRequest, LeaveBalance, ApprovalWorkflow
 from ..schemas import UserRole, RequestStatus, ApprovalStatus
 from ..utils.helpers import get_active_delegate
 
 
+# The active HR admin's id (or None), cached for a minute; the row rarely changes
+_hr_admin_cache = TTLCache(maxsize=1, ttl=60)
+_hr_admin_cache_lock = threading.Lock()
+
+
+def _get_hr_admin_id(db: Session) -> Optional[int]:
+    """
+    Get the id of the active HR admin (cached, filled from the caller's session)
+    """
+    with _hr_admin_cache_lock:
+        if "id" in _hr_admin_cache:
+            return _hr_admin_cache["id"]
+
+    hr_admin_id = db.query(User.id).filter(
+        User.role == UserRole.HR_ADMIN,
+        User.is_active == True
+    ).limit(1).scalar()
+    with _hr_admin_cache_lock:
+        _hr_admin_cache["id"] = hr_admin_id
+    return hr_admin_id
+
+
+def invalidate_hr_admin_cache():
+    """
+    Drop the cached HR admin id; call after creating or updating users
+    """
+    with _hr_admin_cache_lock:
+        _hr_admin_cache.clear()
+
+
+@event.listens_for(User, "after_insert")
+def _user_inserted(mapper, connection, target):
+    """A new HR admin may take over approvals"""
+    if target.role == UserRole.HR_ADMIN:
+        run_after_commit(object_session(target), "hr_admin", invalidate_hr_admin_cache)
+
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target):
+    """Role changes or (de)activation can change who the HR admin is"""
+    state = inspect(target)
+    if state.attrs.role.history.has_changes() or state.attrs.is_active.history.has_changes():
+        run_after_commit(object_session(target), "hr_admin", invalidate_hr_admin_cache)
+
+
 def create_approval_workflow(leave_request: LeaveRequest, db: Session):
     """
     Create multi-level approval workflow for a leave request
     - Employee leaves: Approved by Manager
     - Manager leaves: Approved by HR Admin
     """
-    user = leave_request.user
+    # Fetch the requester's role and the manager chain ids in one projected query
+    manager = aliased(User)
+    role, manager_id, grand_manager_id = db.query(
+        User.role, User.manager_id, manager.manager_id
+    ).outerjoin(manager, manager.id == User.manager_id).filter(
+        User.id == leave_request.user_id
+    ).one()
     approval_level = 1
+    rows = []
 
     # Check if user is a manager
-    if user.role == UserRole.MANAGER:
+    if role == UserRole.MANAGER:
         # Managers' leaves go directly to HR Admin for approval
-        hr_admin = db.query(User).filter(
-            User.role == UserRole.HR_ADMIN,
-            User.is_active == True
-        ).first()
-        if hr_admin:
-            workflow = ApprovalWorkflow(
-                leave_request_id=leave_request.id,
-                approver_id=hr_admin.id,
-                approval_level=approval_level,
-                status=ApprovalStatus.PENDING
-            )
-            db.add(workflow)
+        hr_admin_id = _get_hr_admin_id(db)
+        if hr_admin_id:
+            rows.append({
+                "leave_request_id": leave_request.id,
+                "approver_id": hr_admin_id,
+                "approval_level": approval_level,
+                "status": ApprovalStatus.PENDING.value
+            })
     else:
         # Employee leaves: Level 1 - Direct Manager
-        if user.manager_id:
-            workflow = ApprovalWorkflow(
-                leave_request_id=leave_request.id,
-                approver_id=user.manager_id,
-                approval_level=approval_level,
-                status=ApprovalStatus.PENDING
-            )
-            db.add(workflow)
+        if manager_id:
+            rows.append({
+                "leave_request_id": leave_request.id,
+                "approver_id": manager_id,
+                "approval_level": approval_level,
+                "status": ApprovalStatus.PENDING.value
+            })
             approval_level += 1
 
             # Level 2: Manager's Manager (if exists)
-            manager = db.query(User).filter(User.id == user.manager_id).first()
-            if manager and manager.manager_id:
-                workflow = ApprovalWorkflow(
-                    leave_request_id=leave_request.id,
-                    approver_id=manager.manager_id,
-                    approval_level=approval_level,
-                    status=ApprovalStatus.PENDING
-                )
-                db.add(workflow)
+            if grand_manager_id:
+                rows.append({
+                    "leave_request_id": leave_request.id,
+                    "approver_id": grand_manager_id,
+                    "approval_level": approval_level,
+                    "status": ApprovalStatus.PENDING.value
+                })
                 approval_level += 1
 
         # Level 3: HR Admin (for leaves > 5 days)
         if leave_request.total_days > 5:
-            hr_admin = db.query(User).filter(
-                User.role == UserRole.HR_ADMIN,
-                User.is_active == True
-            ).first()
-            if hr_admin:
-                workflow = ApprovalWorkflow(
-                    leave_request_id=leave_request.id,
-                    approver_id=hr_admin.id,
-                    approval_level=approval_level,
-                    status=ApprovalStatus.PENDING
-                )
-                db.add(workflow)
-
+            hr_admin_id = _get_hr_admin_id(db)
+            if hr_admin_id:
+                rows.append({
+                    "leave_request_id": leave_request.id,
+                    "approver_id": hr_admin_id,
+                    "approval_level": approval_level,
+                    "status": ApprovalStatus.PENDING.value
+                })
+
+    # Insert all levels in one executemany; nothing reads the ORM objects afterwards
+    if rows:
+        db.execute(ApprovalWorkflow.__table__.insert(), rows)
     db.commit()
 
 
+def _balance_filter(leave_request: LeaveRequest):
+    """
+    WHERE criteria for the balance a leave request draws from
+    """
+    return (
+        LeaveBalance.user_id == leave_request.user_id,
+        LeaveBalance.leave_type_id == leave_request.leave_type_id,
+        LeaveBalance.year == leave_request.start_date.year
+    )
+
+
+# Cached lambda statements for process_approval's fetch: the request and all of
+# its approval levels (at most three) in one query, built and compiled once
+if STRICT_LOADING:
+    _APPROVAL_REQUEST_STMT = lambda_stmt(
+        lambda: select(LeaveRequest).options(
+            joinedload(LeaveRequest.approval_workflow), raiseload("*")
+        ).where(LeaveRequest.id == bindparam("leave_request_id"))
+    )
+else:
+    _APPROVAL_REQUEST_STMT = lambda_stmt(
+        lambda: select(LeaveRequest).options(
+            joinedload(LeaveRequest.approval_workflow)
+        ).where(LeaveRequest.id == bindparam("leave_request_id"))
+    )
+
+
 def process_approval(
     leave_request_id: int,
     approver_id: int,
@@ -86,83 +162,86 @@ def process_approval(
     """
     Process approval/rejection and move to next level
     """
-    leave_request = db.query(LeaveRequest).filter(
-        LeaveRequest.id == leave_request_id
-    ).first()
-
-    if not leave_request:
-        raise HTTPException(status_code=404, detail="Leave request not found")
-
-    # Check for active delegation
-    delegate_id = get_active_delegate(approver_id, date.today(), db)
-    effective_approver_id = delegate_id if delegate_id else approver_id
-
-    # Find pending workflow for this approver
-    workflow = db.query(ApprovalWorkflow).filter(
-        ApprovalWorkflow.leave_request_id == leave_request_id,
-        ApprovalWorkflow.approver_id == approver_id,
-        ApprovalWorkflow.status == ApprovalStatus.PENDING
-    ).first()
-
-    if not workflow:
-        raise HTTPException(
-            status_code=404,
-            detail="No pending approval found for this user"
+    # Reads below never need to see pending changes, so keep them from triggering flushes
+    with db.no_autoflush:
+        leave_request = db.scalars(
+            _APPROVAL_REQUEST_STMT, {"leave_request_id": leave_request_id}
+        ).unique().first()
+
+        if not leave_request:
+            raise HTTPException(status_code=404, detail="Leave request not found")
+
+        # Check for active delegation
+        delegate_id = get_active_delegate(approver_id, date.today(), db)
+        effective_approver_id = delegate_id if delegate_id else approver_id
+
+        # Evaluate the level checks in Python over the loaded workflow
+        workflows = leave_request.approval_workflow
+
+        # Find pending workflow for this approver
+        workflow = next(
+            (
+                w for w in workflows
+                if w.approver_id == approver_id and w.status == ApprovalStatus.PENDING
+            ),
+            None
         )
 
-    # Check if this is the current approval level
-    previous_levels = db.query(ApprovalWorkflow).filter(
-        ApprovalWorkflow.leave_request_id == leave_request_id,
-        ApprovalWorkflow.approval_level < workflow.approval_level,
-        ApprovalWorkflow.status != ApprovalStatus.APPROVED
-    ).all()
-
-    if previous_levels:
-        raise HTTPException(
-            status_code=400,
-            detail="Previous approval levels must be completed first"
+        if not workflow:
+            raise HTTPException(
+                status_code=404,
+                detail="No pending approval found for this user"
+            )
+
+        # Check if this is the current approval level (an in-memory EXISTS over the levels)
+        previous_levels_pending = any(
+            w.approval_level < workflow.approval_level and w.status != ApprovalStatus.APPROVED
+            for w in workflows
         )
 
-    # Update workflow
-    workflow.status = ApprovalStatus.APPROVED if approve else ApprovalStatus.REJECTED
-    workflow.comments = comments
-    workflow.approved_at = datetime.utcnow()
-
-    if not approve:
-        # Rejection - update leave request and restore balance
-        leave_request.status = RequestStatus.REJECTED
-        leave_request.updated_at = datetime.utcnow()
-
-        # Restore pending days to available
-        balance = db.query(LeaveBalance).filter(
-            LeaveBalance.user_id == leave_request.user_id,
-            LeaveBalance.leave_type_id == leave_request.leave_type_id,
-            LeaveBalance.year == leave_request.start_date.year
-        ).first()
-
-        if balance:
-            balance.pending_days -= leave_request.total_days
-    else:
-        # Check if this is the last approval level
-        remaining_approvals = db.query(ApprovalWorkflow).filter(
-            ApprovalWorkflow.leave_request_id == leave_request_id,
-            ApprovalWorkflow.approval_level > workflow.approval_level
-        ).all()
-
-        if not remaining_approvals:
-            # Final approval - update leave request and balance
-            leave_request.status = RequestStatus.APPROVED
-            leave_request.updated_at = datetime.utcnow()
-
-            # Update balance
-            balance = db.query(LeaveBalance).filter(
-                LeaveBalance.user_id == leave_request.user_id,
-                LeaveBalance.leave_type_id == leave_request.leave_type_id,
-                LeaveBalance.year == leave_request.start_date.year
-            ).first()
-
-            if balance:
-                balance.used_days += leave_request.total_days
-                balance.pending_days -= leave_request.total_days
+        if previous_levels_pending:
+            raise HTTPException(
+                status_code=400,
+                detail="Previous approval levels must be completed first"
+            )
+
+        # One timestamp for every row this decision touches (naive UTC, like the columns)
+        now = datetime.utcnow()
+
+        # Update workflow
+        workflow.status = ApprovalStatus.APPROVED if approve else ApprovalStatus.REJECTED
+        workflow.comments = comments
+        workflow.approved_at = now
+
+        if not approve:
+            # Rejection - update leave request and restore balance
+            leave_request.status = RequestStatus.REJECTED
+            leave_request.updated_at = now
+
+            # Restore pending days to available
+            db.execute(
+                update(LeaveBalance).where(*_balance_filter(leave_request)).values(
+                    pending_days=LeaveBalance.pending_days - leave_request.total_days
+                )
+            )
+        else:
+            # Check if this is the last approval level
+            has_remaining_approvals = any(
+                w.approval_level > workflow.approval_level for w in workflows
+            )
+
+            if not has_remaining_approvals:
+                # Final approval - update leave request and balance
+                leave_request.status = RequestStatus.APPROVED
+                leave_request.updated_at = now
+
+                # Update balance
+                db.execute(
+                    update(LeaveBalance).where(*_balance_filter(leave_request)).values(
+                        used_days=LeaveBalance.used_days + leave_request.total_days,
+                        pending_days=LeaveBalance.pending_days - leave_request.total_days
+                    )
+                )
 
+    # Single flush of all mutations at commit time
     db.commit()
@@ -2,62 +2,69 @@
 Database seeding service
 """
 from datetime import date
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from ..config import SEED_BCRYPT_ROUNDS
 from ..models import User, LeaveType, LeaveBalance, Holiday
 from ..schemas import UserRole
-from ..utils.auth import get_password_hash
+from ..utils.auth import get_password_hashes
+from ..utils.helpers import invalidate_holiday_cache
+from .leave_service import invalidate_hr_admin_cache
 
 
 def seed_database(db: Session):
     """
     Initialize database with default data
     """
-    # Check if data already exists
-    existing_user = db.query(User).first()
-    if existing_user:
+    # Check if data already exists (a bare id probe, no ORM row)
+    if db.query(User.id).limit(1).scalar() is not None:
         return
 
     print("Seeding database with initial data...")
 
+    # Hash the default passwords in parallel, at the cheap seed cost (their
+    # plaintexts are published below anyway)
+    admin_hash, manager_hash, employee_hash = get_password_hashes(
+        ["admin123", "manager123", "employee123"], rounds=SEED_BCRYPT_ROUNDS
+    )
+
     # Create default HR admin
     hr_admin = User(
         email="admin@company.com",
         full_name="HR Administrator",
-        password_hash=get_password_hash("admin123"),
+        password_hash=admin_hash,
         role=UserRole.HR_ADMIN,
         department="Human Resources",
         hire_date=date(2020, 1, 1)
     )
-    db.add(hr_admin)
-    db.commit()
-    db.refresh(hr_admin)
 
     # Create sample manager
     manager = User(
         email="manager@company.com",
         full_name="John Manager",
-        password_hash=get_password_hash("manager123"),
+        password_hash=manager_hash,
         role=UserRole.MANAGER,
         department="Engineering",
         hire_date=date(2021, 1, 1)
     )
-    db.add(manager)
-    db.commit()
-    db.refresh(manager)
 
-    # Create sample employee
+    # Create sample employee (the relationship lets the flush order the manager first)
     employee = User(
         email="employee@company.com",
         full_name="Jane Employee",
-        password_hash=get_password_hash("employee123"),
+        password_hash=employee_hash,
         role=UserRole.EMPLOYEE,
-        manager_id=manager.id,
+        manager=manager,
         department="Engineering",
         hire_date=date(2022, 6, 1)
     )
-    db.add(employee)
 
-    # Create default leave types
+    users = [hr_admin, manager, employee]
+    db.add_all(users)
+    # Assign user ids for the foreign keys below without committing
+    db.flush()
+
+    # Create default leave types in one INSERT, reading back the ids and quotas
     leave_types_data = [
         {"name": "Annual Leave", "annual_quota": 20, "requires_documentation": False, "is_paid": True},
         {"name": "Sick Leave", "annual_quota": 10, "requires_documentation": True, "is_paid": True},
@@ -65,30 +72,25 @@ def seed_database(db: Session):
         {"name": "Bereavement Leave", "annual_quota": 3, "requires_documentation": True, "is_paid": True},
         {"name": "Unpaid Leave", "annual_quota": 30, "requires_documentation": False, "is_paid": False},
     ]
-
-    leave_types = []
-    for lt_data in leave_types_data:
-        leave_type = LeaveType(**lt_data)
-        db.add(leave_type)
-        leave_types.append(leave_type)
-
-    db.commit()
+    leave_types = db.execute(
+        insert(LeaveType).returning(LeaveType.id, LeaveType.annual_quota),
+        leave_types_data
+    ).all()
 
     # Initialize leave balances for current year
     current_year = date.today().year
-    users = [hr_admin, manager, employee]
-
-    for user in users:
-        for leave_type in leave_types:
-            balance = LeaveBalance(
-                user_id=user.id,
-                leave_type_id=leave_type.id,
-                year=current_year,
-                total_days=leave_type.annual_quota,
-                used_days=0,
-                pending_days=0
-            )
-            db.add(balance)
+    db.execute(insert(LeaveBalance), [
+        {
+            "user_id": user.id,
+            "leave_type_id": leave_type_id,
+            "year": current_year,
+            "total_days": annual_quota,
+            "used_days": 0,
+            "pending_days": 0
+        }
+        for user in users
+        for leave_type_id, annual_quota in leave_types
+    ])
 
     # Add some sample holidays
     holidays_data = [
@@ -97,17 +99,15 @@ def seed_database(db: Session):
         {"name": "Thanksgiving", "date": date(current_year, 11, 28)},
         {"name": "Christmas", "date": date(current_year, 12, 25)},
     ]
-
-    for holiday_data in holidays_data:
-        holiday = Holiday(
-            name=holiday_data["name"],
-            date=holiday_data["date"],
-            is_mandatory=True,
-            created_by=hr_admin.id
-        )
-        db.add(holiday)
+    db.execute(insert(Holiday), [
+        {**holiday_data, "is_mandatory": True, "created_by": hr_admin.id}
+        for holiday_data in holidays_data
+    ])
 
     db.commit()
+    # The Core inserts above skip the mapper events, so clear the caches explicitly
+    invalidate_hr_admin_cache()
+    invalidate_holiday_cache()
 
     print("Database seeded successfully!")
     print("\nDefault credentials:")
@@ -1,15 +1,28 @@
 """
 Utility functions
 """
-from .auth import verify_password, get_password_hash, create_access_token, decode_access_token
-from .helpers import calculate_working_days, check_overlapping_requests, get_active_delegate
+from .auth import (
+    verify_password,
+    get_password_hash,
+    get_password_hashes,
+    create_access_token,
+    decode_access_token,
+)
+from .helpers import (
+    calculate_working_days,
+    check_overlapping_requests,
+    get_active_delegate,
+    invalidate_holiday_cache,
+)
 
 __all__ = [
     "verify_password",
     "get_password_hash",
+    "get_password_hashes",
     "create_access_token",
     "decode_access_token",
     "calculate_working_days",
     "check_overlapping_requests",
     "get_active_delegate",
+    "invalidate_holiday_cache",
 ]
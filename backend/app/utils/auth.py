@@ -1,27 +1,85 @@
 """
 Authentication utilities
 """
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
+from typing import Iterable, List, Optional, Union
+from cachetools import TLRUCache, TTLCache
+import jwt as pyjwt
 import bcrypt as bcrypt_lib
 from fastapi import HTTPException, status
-from ..config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from ..config import (
+    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES,
+    BCRYPT_ROUNDS, PASSWORD_VERIFY_CACHE_ENABLED
+)
 from ..schemas import TokenData
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return bcrypt_lib.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+# HMAC key bytes encoded once instead of on every sign/verify
+_SIGNING_KEY = SECRET_KEY.encode()
 
+# Verified token payloads, keyed by a digest so raw tokens are never retained.
+# Each entry lives for at most a minute and never past the token's own exp claim.
+_TOKEN_CACHE_TTL = 60
+_token_cache = TLRUCache(
+    maxsize=10000,
+    ttu=lambda key, value, now: min(now + _TOKEN_CACHE_TTL, value[1]),
+    timer=time.time
+)
+_token_cache_lock = threading.Lock()
 
-def get_password_hash(password: str) -> str:
-    """Generate password hash"""
-    salt = bcrypt_lib.gensalt()
-    hashed = bcrypt_lib.hashpw(password.encode('utf-8'), salt)
+# Successful password checks only; failures are never cached so they always pay the bcrypt cost
+_pw_cache = TTLCache(maxsize=2048, ttl=60)
+_pw_cache_lock = threading.Lock()
+
+# bcrypt only reads the first 72 bytes. bcrypt<5 truncated longer input silently and
+# bcrypt>=5 raises instead, so truncate explicitly: hashes made under either version
+# keep verifying, and long passwords never reach bcrypt 5's ValueError.
+_MAX_PASSWORD_BYTES = 72
+
+
+def verify_password(plain_password: Union[str, bytes], hashed_password: Union[str, bytes]) -> bool:
+    """Verify a password against its hash (either may be passed pre-encoded as UTF-8 bytes)"""
+    # Encode each side once; bytes from the caller are used as-is
+    password_bytes = plain_password.encode('utf-8') if isinstance(plain_password, str) else plain_password
+    password_bytes = password_bytes[:_MAX_PASSWORD_BYTES]
+    hashed_bytes = hashed_password.encode('utf-8') if isinstance(hashed_password, str) else hashed_password
+
+    # An empty password never matches; skip the KDF
+    if not password_bytes:
+        return False
+
+    if not PASSWORD_VERIFY_CACHE_ENABLED:
+        return bcrypt_lib.checkpw(password_bytes, hashed_bytes)
+
+    cache_key = hashlib.sha256(password_bytes + hashed_bytes).digest()
+    with _pw_cache_lock:
+        if cache_key in _pw_cache:
+            return True
+
+    verified = bcrypt_lib.checkpw(password_bytes, hashed_bytes)
+    if verified:
+        with _pw_cache_lock:
+            _pw_cache[cache_key] = True
+    return verified
+
+
+def get_password_hash(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    """Generate password hash (pass a lower rounds only for non-production data such as the seed)"""
+    salt = bcrypt_lib.gensalt(rounds=rounds)
+    hashed = bcrypt_lib.hashpw(password.encode('utf-8')[:_MAX_PASSWORD_BYTES], salt)
     return hashed.decode('utf-8')
 
 
+def get_password_hashes(passwords: Iterable[str], rounds: int = BCRYPT_ROUNDS) -> List[str]:
+    """Hash many passwords in parallel (bcrypt releases the GIL while hashing)"""
+    with ThreadPoolExecutor() as executor:
+        return list(executor.map(lambda password: get_password_hash(password, rounds), passwords))
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -30,14 +88,20 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = pyjwt.encode(to_encode, _SIGNING_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
 def decode_access_token(token: str) -> TokenData:
     """Decode and validate a JWT token"""
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    with _token_cache_lock:
+        cached = _token_cache.get(cache_key)
+    if cached is not None:
+        return cached[0]
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = pyjwt.decode(token, _SIGNING_KEY, algorithms=[ALGORITHM])
         user_id: int = payload.get("user_id")
         email: str = payload.get("email")
         role: str = payload.get("role")
@@ -46,8 +110,13 @@ def decode_access_token(token: str) -> TokenData:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token"
             )
-        return TokenData(user_id=user_id, email=email, role=role)
-    except JWTError:
+        token_data = TokenData(user_id=user_id, email=email, role=role)
+        with _token_cache_lock:
+            _token_cache[cache_key] = (token_data, payload.get("exp", 0))
+        return token_data
+    except pyjwt.PyJWTError:
+        with _token_cache_lock:
+            _token_cache.pop(cache_key, None)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token"
@@ -1,13 +1,59 @@
 """
 Helper utility functions
 """
-from datetime import date, timedelta
+import threading
+from datetime import date
 from typing import Optional
-from sqlalchemy.orm import Session
+import numpy as np
+from cachetools import TTLCache
+from sqlalchemy import bindparam, event, exists, lambda_stmt, select
+from sqlalchemy.orm import Session, object_session
+from ..database import run_after_commit
 from ..models import Holiday, LeaveRequest, Delegation
 from ..schemas import RequestStatus
 
 
+# Holiday dates per year as sorted datetime64 arrays (holidays change rarely)
+_holiday_cache = TTLCache(maxsize=8, ttl=3600)
+_holiday_cache_lock = threading.Lock()
+
+
+def _holidays_for_year(year: int, db: Session) -> np.ndarray:
+    """
+    Get a year's holiday dates as a sorted datetime64 array, filled from the caller's session
+    """
+    with _holiday_cache_lock:
+        cached = _holiday_cache.get(year)
+    if cached is not None:
+        return cached
+
+    rows = db.query(Holiday.date).filter(
+        Holiday.date >= date(year, 1, 1),
+        Holiday.date <= date(year, 12, 31)
+    ).distinct().order_by(Holiday.date).all()
+    holidays = np.array([row.date for row in rows], dtype="datetime64[D]")
+    holidays.flags.writeable = False
+    with _holiday_cache_lock:
+        _holiday_cache[year] = holidays
+    return holidays
+
+
+def invalidate_holiday_cache():
+    """
+    Drop cached holiday dates; call after creating, updating or deleting holidays
+    """
+    with _holiday_cache_lock:
+        _holiday_cache.clear()
+
+
+@event.listens_for(Holiday, "after_insert")
+@event.listens_for(Holiday, "after_update")
+@event.listens_for(Holiday, "after_delete")
+def _holiday_changed(mapper, connection, target):
+    """Any ORM write to a holiday drops the cached dates once it commits"""
+    run_after_commit(object_session(target), "holidays", invalidate_holiday_cache)
+
+
 def calculate_working_days(start_date: date, end_date: date, db: Session) -> float:
     """
     Calculate working days excluding weekends and holidays
@@ -15,21 +61,21 @@ def calculate_working_days(start_date: date, end_date: date, db: Session) -> flo
     if start_date > end_date:
         raise ValueError("Start date must be before end date")
 
-    # Get holidays in the date range
-    holidays = db.query(Holiday).filter(
-        Holiday.date >= start_date,
-        Holiday.date <= end_date
-    ).all()
-    holiday_dates = {h.date for h in holidays}
-
-    working_days = 0
-    current_date = start_date
+    # Get holidays for every year the range spans; each year's array is already
+    # sorted and the years are disjoint, so joining them keeps the order
+    if start_date.year == end_date.year:
+        holiday_dates = _holidays_for_year(start_date.year, db)
+    else:
+        holiday_dates = np.concatenate([
+            _holidays_for_year(year, db) for year in range(start_date.year, end_date.year + 1)
+        ])
 
-    while current_date <= end_date:
-        # Skip weekends (5=Saturday, 6=Sunday)
-        if current_date.weekday() < 5 and current_date not in holiday_dates:
-            working_days += 1
-        current_date += timedelta(days=1)
+    # busday_count excludes the end date and skips weekends (Mon-Fri weekmask) natively
+    working_days = np.busday_count(
+        np.datetime64(start_date),
+        np.datetime64(end_date) + 1,
+        holidays=holiday_dates
+    )
 
     return float(working_days)
 
@@ -44,28 +90,35 @@ def check_overlapping_requests(
     """
     Check if user has overlapping leave requests
     """
-    query = db.query(LeaveRequest).filter(
+    conditions = [
         LeaveRequest.user_id == user_id,
         LeaveRequest.status.in_([RequestStatus.PENDING, RequestStatus.APPROVED]),
         LeaveRequest.start_date <= end_date,
         LeaveRequest.end_date >= start_date
-    )
+    ]
 
     if exclude_request_id:
-        query = query.filter(LeaveRequest.id != exclude_request_id)
+        conditions.append(LeaveRequest.id != exclude_request_id)
 
-    return query.first() is not None
+    # EXISTS stops at the first match of ix_leave_requests_user_status_dates without loading a row
+    return db.scalar(select(exists().where(*conditions)))
+
+
+# Cached lambda statement: built and compiled once, only the parameters change per call
+_ACTIVE_DELEGATE_STMT = lambda_stmt(
+    lambda: select(Delegation.delegate_id).where(
+        Delegation.delegator_id == bindparam("approver_id"),
+        Delegation.is_active == True,
+        Delegation.start_date <= bindparam("approval_date"),
+        Delegation.end_date >= bindparam("approval_date")
+    ).limit(1)
+)
 
 
 def get_active_delegate(approver_id: int, approval_date: date, db: Session) -> Optional[int]:
     """
     Get active delegate for an approver on a specific date
     """
-    delegation = db.query(Delegation).filter(
-        Delegation.delegator_id == approver_id,
-        Delegation.is_active == True,
-        Delegation.start_date <= approval_date,
-        Delegation.end_date >= approval_date
-    ).first()
-
-    return delegation.delegate_id if delegation else None
+    return db.scalar(
+        _ACTIVE_DELEGATE_STMT, {"approver_id": approver_id, "approval_date": approval_date}
+    )